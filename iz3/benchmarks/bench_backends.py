@@ -0,0 +1,85 @@
+# benchmarks/bench_backends.py
+"""
+Сравнение бэкендов инференса YOLO на CPU: задержка на кадр и совпадение боксов
+с PyTorch-бэкендом (ultralytics).
+
+Запуск (из папки iz3):
+    python -m benchmarks.bench_backends --model path/to/best.pt --images path/to/folder
+"""
+import os
+import time
+import argparse
+
+import cv2
+import numpy as np
+
+from core.backends import create_backend
+
+
+def load_images(folder, limit):
+    images = []
+    for name in sorted(os.listdir(folder)):
+        if not name.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.webp')): continue
+        img = cv2.imdecode(np.fromfile(os.path.join(folder, name), dtype=np.uint8), cv2.IMREAD_COLOR)
+        if img is not None:
+            images.append(img)
+        if len(images) >= limit: break
+    return images
+
+
+def match_boxes(reference, candidate, tol=2):
+    """Сколько боксов reference имеют пару в candidate с отклонением координат <= tol px"""
+    if not reference: return 0
+    if not candidate: return 0
+    ref = np.array(reference)
+    cand = np.array(candidate)
+    diff = np.abs(ref[:, None, :] - cand[None, :, :]).max(axis=2)
+    return int((diff.min(axis=1) <= tol).sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", required=True)
+    parser.add_argument("--images", required=True)
+    parser.add_argument("--backends", nargs="+", default=["ultralytics", "onnxruntime", "openvino"])
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--warmup", type=int, default=3)
+    args = parser.parse_args()
+
+    images = load_images(args.images, args.limit)
+    if not images:
+        print("No images found")
+        return
+
+    outputs = {}
+    print(f"{'backend':>12} {'mean, ms':>10} {'p95, ms':>9} {'boxes':>7} {'matched':>8}")
+    for name in args.backends:
+        try:
+            backend = create_backend(name, args.model, threads=args.threads)
+        except ImportError as e:
+            print(f"{name:>12}  skipped ({e})")
+            continue
+
+        for img in images[:args.warmup]:
+            backend.predict([img])
+
+        times, preds = [], []
+        for img in images:
+            t0 = time.perf_counter()
+            preds.append(backend.predict([img])[0])
+            times.append(time.perf_counter() - t0)
+        outputs[name] = preds
+
+        reference = outputs.get("ultralytics")
+        total = sum(len(b) for b, _ in preds)
+        matched = "-"
+        if reference is not None and name != "ultralytics":
+            matched = sum(match_boxes(r[0], p[0]) for r, p in zip(reference, preds))
+            matched = f"{matched}/{sum(len(b) for b, _ in reference)}"
+        print(f"{name:>12} {np.mean(times) * 1000:>10.2f} {np.percentile(times, 95) * 1000:>9.2f} "
+              f"{total:>7} {matched:>8}")
+
+
+if __name__ == "__main__":
+    main()
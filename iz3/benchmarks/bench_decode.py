@@ -0,0 +1,91 @@
+# benchmarks/bench_decode.py
+"""
+Микро-бенчмарк перебора поворотов try_decode_rotated: время и успешность
+каждой попытки (угол x предобработка) в зависимости от размера ROI.
+Каждая попытка запускается отдельно, даже если предыдущая уже декодировала QR,
+чтобы кривая показывала цену всех стратегий перебора (не только выбранных).
+
+Запуск (из папки iz3):  python -m benchmarks.bench_decode --sizes 80 160 320 640 --json decode.json
+"""
+import json
+import time
+import argparse
+
+import cv2
+import numpy as np
+
+import config
+from benchmarks.corpus import encode_qr
+
+
+def make_roi(side, seed):
+    """
+    Вырез как у get_qr_crop: QR стороной side под случайным углом,
+    вокруг отступ 0.6 стороны + 20 px, легкое размытие и шум.
+    """
+    rng = np.random.default_rng([seed, side])
+    qr = encode_qr(f"IZ3-bench-{side}-{seed}")
+    qr = cv2.resize(qr, (side, side), interpolation=cv2.INTER_NEAREST)
+
+    pad = int(side * 0.6) + 20
+    size = side + 2 * pad
+    angle = rng.uniform(-180, 180)
+    matrix = cv2.getRotationMatrix2D((side / 2, side / 2), angle, 1.0)
+    matrix[:, 2] += pad
+    roi = cv2.warpAffine(qr, matrix, (size, size), flags=cv2.INTER_LINEAR, borderValue=int(rng.integers(150, 256)))
+    roi = cv2.GaussianBlur(roi, (0, 0), rng.uniform(0.3, 1.2))
+    roi = np.clip(roi + rng.normal(0, 6, roi.shape), 0, 255).astype(np.uint8)
+    return cv2.cvtColor(roi, cv2.COLOR_GRAY2BGR)
+
+
+def main():
+    from core.detector import QRDetector, ROTATED_STEPS, ROTATE_CODES
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default=config.MODEL_PATH)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[60, 80, 120, 160, 240, 320, 480, 640])
+    parser.add_argument("--samples", type=int, default=10, help="ROI на каждый размер")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="файл для кривых (мс и доля успехов по шагам)")
+    args = parser.parse_args()
+
+    detector = QRDetector(args.model, backend=config.INFERENCE_BACKEND, cache_size=0)
+    steps = list(ROTATED_STEPS)
+    names = [f"{angle}.{prep}" for angle, prep in steps]
+
+    print(f"{'side':>5} " + " ".join(f"{n:>12}" for n in names) + f" {'full, ms':>9}")
+    curve = []
+    for side in args.sizes:
+        times = {n: [] for n in names}
+        hits = {n: 0 for n in names}
+        full = []
+        for sample in range(args.samples):
+            roi = make_roi(side, args.seed + sample)
+            for (angle, prep), name in zip(steps, names):
+                img = roi if angle == 0 else cv2.rotate(roi, ROTATE_CODES[angle])
+                t0 = time.perf_counter()
+                text = detector.rotated_attempt(img, angle, prep)
+                times[name].append(time.perf_counter() - t0)
+                hits[name] += int(bool(text))
+
+            t0 = time.perf_counter()
+            detector.try_decode_rotated(roi)
+            full.append(time.perf_counter() - t0)
+
+        row = {"side": side, "samples": args.samples,
+               "full_ms": round(float(np.median(full)) * 1000, 3), "steps": {}}
+        for name in names:
+            row["steps"][name] = {"median_ms": round(float(np.median(times[name])) * 1000, 3),
+                                  "hit_rate": round(hits[name] / args.samples, 3)}
+        curve.append(row)
+        cells = [f"{row['steps'][n]['median_ms']:>7.1f}/{row['steps'][n]['hit_rate']:<4.2f}" for n in names]
+        print(f"{side:>5} " + " ".join(cells) + f" {row['full_ms']:>9.1f}")
+
+    print("ячейка: медиана мс / доля успехов; full - try_decode_rotated целиком (до первого успеха)")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"seed": args.seed, "steps": names, "curve": curve}, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+# benchmarks/bench_detector.py
+"""
+Сквозной бенчмарк QRDetector на синтетическом корпусе (benchmarks/corpus.py):
+пропускная способность, задержка кадра и стадий (p50/p95/p99), пиковый RSS
+и recall декодирования. Результат - JSON, который можно сравнить с прошлым прогоном.
+
+Запуск (из папки iz3):
+    python -m benchmarks.bench_detector --images 200 --out results.json
+    python -m benchmarks.bench_detector --corpus corpus --out new.json --compare results.json
+Параметры детектора по умолчанию берутся из config.py.
+"""
+import sys
+import json
+import time
+import platform
+import argparse
+
+import numpy as np
+
+import config
+from benchmarks.corpus import CORPUS_DEFAULTS, iter_corpus, load_corpus
+
+# Метрики для --compare: (путь в результатах, больше = лучше)
+COMPARE_KEYS = (
+    (("throughput_ips",), True),
+    (("latency_ms", "p50"), False),
+    (("latency_ms", "p95"), False),
+    (("latency_ms", "p99"), False),
+    (("recall",), True),
+    (("peak_rss_mb",), False),
+)
+
+
+def peak_rss_mb():
+    """Пиковый RSS процесса, МБ (psutil, иначе resource; None, если недоступно)"""
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        peak = getattr(info, "peak_wset", None) or getattr(info, "peak_rss", None)
+        if peak: return round(peak / 2 ** 20, 1)
+    except ImportError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux - КБ, macOS - байты
+        return round(peak / (2 ** 20 if sys.platform == "darwin" else 2 ** 10), 1)
+    except ImportError:
+        return None
+
+
+def percentiles_ms(seconds):
+    if not seconds: return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0}
+    ms = np.asarray(seconds, dtype=np.float64) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {"p50": round(float(p50), 3), "p95": round(float(p95), 3),
+            "p99": round(float(p99), 3), "mean": round(float(ms.mean()), 3)}
+
+
+def build_detector(args):
+    from core.detector import QRDetector
+    return QRDetector(args.model, backend=args.backend, threads=config.INFERENCE_THREADS,
+                      profile=args.profile, tile_size=config.TILE_SIZE, tile_overlap=config.TILE_OVERLAP,
+                      tile_min_side=config.TILE_MIN_SIDE, coarse_side=config.COARSE_SIDE,
+                      decoders=config.DECODER_CASCADE, decode_workers=args.decode_workers,
+                      cache_size=0)
+
+
+def _chunks(corpus, size):
+    chunk = []
+    for item in corpus:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk: yield chunk
+
+
+def run(detector, corpus, batch_size=0, warmup=2):
+    """
+    Прогон корпуса. batch_size=0 - detect по одному кадру, иначе detect_batch.
+    Корпус читается потоково (в памяти не больше одной пачки), чтобы не искажать RSS.
+    Кэш декодирования должен быть выключен, иначе повторы искажают задержку.
+    """
+    durations, stages = [], {}
+    n_images = expected = found = false_texts = 0
+    wall = 0.0
+
+    for chunk in _chunks(corpus, max(batch_size, 1)):
+        if warmup > 0:
+            # Прогрев на первой пачке: ее время и статистика не учитываются
+            for _ in range(warmup): detector.detect(chunk[0][0])
+            detector.decode_stats.reset()
+            warmup = 0
+
+        t_start = time.perf_counter()
+        if batch_size > 0:
+            results = detector.detect_batch([img for img, _ in chunk], batch_size)
+        else:
+            results = [detector.detect(chunk[0][0])]
+        wall += time.perf_counter() - t_start
+
+        for (_, info), result in zip(chunk, results):
+            n_images += 1
+            durations.append(result.duration)
+            for stage, seconds in result.timings.items():
+                stages.setdefault(stage, []).append(seconds)
+
+            truth = {c["text"] for c in info["codes"]}
+            texts = {code.text for code in result}
+            expected += len(truth)
+            found += len(truth & texts)
+            false_texts += len(texts - truth)
+
+    return {
+        "images": n_images,
+        "codes": expected,
+        "decoded": found,
+        "false_decodes": false_texts,
+        "recall": round(found / expected, 4) if expected else 0.0,
+        "wall_s": round(wall, 3),
+        "throughput_ips": round(n_images / wall, 3) if wall else 0.0,
+        "latency_ms": percentiles_ms(durations),
+        "stages_ms": {stage: percentiles_ms(v) for stage, v in sorted(stages.items())},
+        "decode_tiers": detector.decode_stats.snapshot(),
+    }
+
+
+def _lookup(report, path):
+    for key in path:
+        report = report.get(key) if isinstance(report, dict) else None
+    return report
+
+
+def compare(current, baseline):
+    """Таблица изменений ключевых метрик относительно baseline"""
+    print(f"{'metric':<20} {'baseline':>12} {'current':>12} {'change':>9}")
+    for path, higher_is_better in COMPARE_KEYS:
+        old, new = _lookup(baseline, path), _lookup(current, path)
+        if old is None or new is None: continue
+        change = (new - old) / old * 100 if old else 0.0
+        better = change >= 0 if higher_is_better else change <= 0
+        print(f"{'.'.join(path):<20} {old:>12} {new:>12} {change:>+8.1f}% {'' if better else '(worse)'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default=config.MODEL_PATH)
+    parser.add_argument("--backend", default=config.INFERENCE_BACKEND)
+    parser.add_argument("--profile", default=config.MODEL_PROFILE)
+    parser.add_argument("--decode-workers", type=int, default=config.DECODE_WORKERS)
+    parser.add_argument("--corpus", help="сохраненный корпус (иначе генерируется в памяти)")
+    parser.add_argument("--images", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=0, help="0 - detect по кадру, иначе detect_batch")
+    parser.add_argument("--out", help="файл JSON с результатами")
+    parser.add_argument("--compare", help="JSON прошлого прогона для сравнения")
+    args = parser.parse_args()
+
+    if args.corpus:
+        manifest, corpus = load_corpus(args.corpus)
+        corpus_info = {"path": args.corpus, "seed": manifest["seed"], "params": manifest["params"],
+                       "images": len(manifest["images"])}
+    else:
+        corpus = iter_corpus(args.images, args.seed)
+        corpus_info = {"seed": args.seed, "params": dict(CORPUS_DEFAULTS), "images": args.images}
+
+    t_load = time.perf_counter()
+    detector = build_detector(args)
+    load_s = time.perf_counter() - t_load
+
+    report = run(detector, corpus, args.batch_size)
+    report.update({
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "detector": {"backend": detector.backend.name, "profile": args.profile,
+                     "decoders": list(detector.decoders), "decode_workers": args.decode_workers,
+                     "batch_size": args.batch_size},
+        "corpus": corpus_info,
+        "model_load_s": round(load_s, 3),
+        "peak_rss_mb": peak_rss_mb(),
+    })
+    detector.close()
+
+    print(f"images={report['images']} codes={report['codes']} recall={report['recall']} "
+          f"throughput={report['throughput_ips']} img/s p50={report['latency_ms']['p50']} ms "
+          f"p95={report['latency_ms']['p95']} ms peak_rss={report['peak_rss_mb']} MB")
+    for stage, row in report["stages_ms"].items():
+        print(f"  {stage:<24} p50={row['p50']:>9} p95={row['p95']:>9} p99={row['p99']:>9}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
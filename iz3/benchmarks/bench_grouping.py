@@ -0,0 +1,108 @@
+# benchmarks/bench_grouping.py
+"""
+Сравнение скорости группировки finder patterns:
+эталонный перебор на Python, векторный полный перебор на NumPy
+и векторная версия с отсечением троек по пространственной сетке.
+
+Запуск (из папки iz3):  python -m benchmarks.bench_grouping
+Кривая масштабирования в JSON:  python -m benchmarks.bench_grouping --json grouping.json
+"""
+import time
+import json
+import argparse
+import numpy as np
+
+from core.grouping import group_finder_patterns, group_finder_patterns_py
+
+
+def make_boxes(n_boxes, seed=0, width=3840, height=2160):
+    """
+    Синтетический набор боксов: полные QR-тройки (угол + два соседних паттерна)
+    плюс случайный мусор, если n_boxes не делится на 3.
+    """
+    rng = np.random.default_rng(seed)
+    boxes, confs = [], []
+
+    for _ in range(n_boxes // 3):
+        size = rng.uniform(15, 60)
+        leg = size * rng.uniform(3, 6)
+        theta = rng.uniform(0, 2 * np.pi)
+        corner = rng.uniform([leg, leg], [width - leg, height - leg])
+        ux = np.array([np.cos(theta), np.sin(theta)])
+        uy = np.array([-np.sin(theta), np.cos(theta)])
+        for c in (corner, corner + leg * ux, corner + leg * uy):
+            s = size * rng.uniform(0.9, 1.1)
+            c = c + rng.normal(0, 1.5, 2)
+            boxes.append(np.array([c[0] - s / 2, c[1] - s / 2, c[0] + s / 2, c[1] + s / 2]).astype(int))
+            confs.append(float(rng.uniform(0.3, 0.95)))
+
+    while len(boxes) < n_boxes:
+        s = rng.uniform(15, 60)
+        x, y = rng.uniform(0, width - s), rng.uniform(0, height - s)
+        boxes.append(np.array([x, y, x + s, y + s]).astype(int))
+        confs.append(float(rng.uniform(0.25, 0.6)))
+
+    order = rng.permutation(n_boxes)
+    return [boxes[i] for i in order], [confs[i] for i in order]
+
+
+def same_groups(expected, actual):
+    if len(expected) != len(actual): return False
+    keys = ('score', 'yolo_conf', 'indices', 'points', 'corner', 'span')
+    for e, a in zip(expected, actual):
+        for k in keys:
+            if e[k] != a[k]: return False
+    return True
+
+
+def best_time(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[3, 6, 9, 15, 30, 45, 60, 80, 120, 240, 360, 500])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-python", type=int, default=120,
+                        help="эталон на Python запускается только до этого числа боксов")
+    parser.add_argument("--json", help="файл для кривой масштабирования (время в мс по числу боксов)")
+    args = parser.parse_args()
+
+    curve = []
+
+    print(f"{'boxes':>6} {'groups':>7} {'python, ms':>12} {'numpy, ms':>11} {'pruned, ms':>11} {'auto, ms':>9}  match")
+    for n in args.sizes:
+        boxes, confs = make_boxes(n, seed=args.seed)
+        full = group_finder_patterns(boxes, confs, prune=False)
+        pruned = group_finder_patterns(boxes, confs, prune=True)
+        match = same_groups(full, pruned)
+
+        t_np = best_time(lambda: group_finder_patterns(boxes, confs, prune=False), args.repeat)
+        t_pr = best_time(lambda: group_finder_patterns(boxes, confs, prune=True), args.repeat)
+        t_auto = best_time(lambda: group_finder_patterns(boxes, confs), args.repeat)
+        t_ref = None
+        if n <= args.max_python:
+            match = match and same_groups(group_finder_patterns_py(boxes, confs), full)
+            t_ref = best_time(lambda: group_finder_patterns_py(boxes, confs), args.repeat)
+        t_py = f"{t_ref * 1000:.2f}" if t_ref is not None else "-"
+        print(f"{n:>6} {len(pruned):>7} {t_py:>12} {t_np * 1000:>11.2f} {t_pr * 1000:>11.2f} {t_auto * 1000:>9.2f}  "
+              f"{'OK' if match else 'MISMATCH'}")
+
+        curve.append({"boxes": n, "groups": len(pruned), "match": match,
+                      "python_ms": round(t_ref * 1000, 3) if t_ref is not None else None,
+                      "numpy_ms": round(t_np * 1000, 3), "pruned_ms": round(t_pr * 1000, 3),
+                      "auto_ms": round(t_auto * 1000, 3)})
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"seed": args.seed, "repeat": args.repeat, "curve": curve}, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# benchmarks/bench_import.py
+"""
+Проверка времени импорта (python -X importtime) модулей, которые грузятся при старте:
+суммарное время, самые дорогие модули и запрет тяжелых зависимостей
+(torch, ultralytics, qreader, ...) - они должны импортироваться лениво.
+
+Запуск (из папки iz3):  python -m benchmarks.bench_import --max-ms 1500 --json imports.json
+Код возврата 1, если модуль не импортируется, импортирован запрещенный модуль или превышен --max-ms.
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+# Что импортирует старт приложения (main.py -> ui.main_window) и что импортирует сам детектор
+DEFAULT_MODULES = ("ui.main_window", "core.detector")
+# Должны подгружаться только при первом использовании
+HEAVY_MODULES = ("torch", "torchvision", "ultralytics", "qreader", "onnxruntime", "openvino", "onnx")
+
+IZ3_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_profile(module):
+    """
+    Импорт модуля в чистом интерпретаторе с -X importtime.
+    Возвращает (ok, ошибка, записи [(модуль, self_us, cumulative_us, уровень вложенности)]).
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=IZ3_DIR, capture_output=True, text=True)
+    entries, errors = [], []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            errors.append(line)
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit(): continue
+        name = parts[2].rstrip()
+        level = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), int(parts[0]), int(parts[1]), level))
+    error = errors[-1] if proc.returncode != 0 and errors else None
+    return proc.returncode == 0, error, entries
+
+
+def summarize(module, entries, forbid, top):
+    # Верхний уровень вложенности минимален (у importtime отступ начинается с 1)
+    base = min((e[3] for e in entries), default=0)
+    total_us = sum(e[2] for e in entries if e[3] == base)
+    roots = {e[0].split(".")[0] for e in entries}
+    heavy = sorted(m for m in forbid if m in roots)
+    slowest = sorted(entries, key=lambda e: -e[1])[:top]
+    return {
+        "module": module,
+        "total_ms": round(total_us / 1000, 1),
+        "modules_imported": len(entries),
+        "heavy_imported": heavy,
+        "top_self_ms": [{"module": e[0], "self_ms": round(e[1] / 1000, 2), "cumulative_ms": round(e[2] / 1000, 2)}
+                        for e in slowest],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modules", nargs="+", default=list(DEFAULT_MODULES))
+    parser.add_argument("--forbid", nargs="*", default=list(HEAVY_MODULES))
+    parser.add_argument("--max-ms", type=float, default=0, help="порог суммарного времени импорта (0 - без порога)")
+    parser.add_argument("--repeat", type=int, default=3, help="берется лучший из прогонов")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", help="файл JSON с результатами")
+    args = parser.parse_args()
+
+    failed = False
+    report = []
+    for module in args.modules:
+        best = None
+        for _ in range(args.repeat):
+            ok, error, entries = import_profile(module)
+            if not ok:
+                print(f"[WARNING] import {module} failed: {error}")
+                break
+            summary = summarize(module, entries, args.forbid, args.top)
+            if best is None or summary["total_ms"] < best["total_ms"]: best = summary
+        if best is None:
+            report.append({"module": module, "error": error})
+            failed = True
+            continue
+        report.append(best)
+
+        over = args.max_ms > 0 and best["total_ms"] > args.max_ms
+        status = "OK"
+        if best["heavy_imported"]: status = f"HEAVY: {', '.join(best['heavy_imported'])}"
+        elif over: status = f"SLOW (> {args.max_ms:.0f} ms)"
+        failed = failed or bool(best["heavy_imported"]) or over
+
+        print(f"{module}: {best['total_ms']} ms, {best['modules_imported']} modules - {status}")
+        for row in best["top_self_ms"]:
+            print(f"    {row['module']:<40} self {row['self_ms']:>8.2f} ms   cumulative {row['cumulative_ms']:>8.2f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "results": report}, f, indent=1)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# benchmarks/bench_server.py
+"""
+Нагрузочный loopback-клиент для server.py: параллельные POST /detect с кадрами
+синтетического корпуса, пропускная способность, задержки на клиенте и /stats сервера.
+Без --url сервер поднимается в этом же процессе на свободном порту 127.0.0.1 - сеть не нужна,
+с --stub вместо YOLO работает заглушка (benchmarks/stub_backend.py) - не нужны и веса модели.
+
+Запуск (из папки iz3):  python -m benchmarks.bench_server --requests 200 --concurrency 16
+                        python -m benchmarks.bench_server --stub --stub-delay 20
+"""
+import json
+import time
+import uuid
+import argparse
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+import config
+from benchmarks.bench_detector import percentiles_ms
+from benchmarks.corpus import iter_corpus
+
+
+def encode_multipart(field, filename, data, content_type="image/png"):
+    boundary = uuid.uuid4().hex
+    body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"{field}\"; filename=\"{filename}\"\r\n"
+            f"Content-Type: {content_type}\r\n\r\n").encode("latin-1") + data + f"\r\n--{boundary}--\r\n".encode("latin-1")
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def post_image(url, png_bytes, multipart=False, timeout=60):
+    """POST /detect -> (HTTP-код, JSON)"""
+    if multipart:
+        body, content_type = encode_multipart("image", "frame.png", png_bytes)
+    else:
+        body, content_type = png_bytes, "image/png"
+    request = urllib.request.Request(url + "/detect", data=body, method="POST",
+                                     headers={"Content-Type": content_type})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"{}")
+
+
+def get_json(url, path):
+    with urllib.request.urlopen(url + path, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def run_load(url, frames, requests, concurrency, multipart=False):
+    """requests запросов из concurrency потоков по кругу кадров; (отчет, ответы)"""
+    latencies, statuses = [], {}
+    lock = threading.Lock()
+
+    def one(i):
+        t0 = time.perf_counter()
+        status, payload = post_image(url, frames[i % len(frames)], multipart)
+        elapsed = time.perf_counter() - t0
+        with lock:
+            latencies.append(elapsed)
+            statuses[status] = statuses.get(status, 0) + 1
+        return payload
+
+    t_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        responses = list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - t_start
+
+    report = {
+        "requests": requests,
+        "concurrency": concurrency,
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(requests / wall, 3) if wall else 0.0,
+        "client_latency_ms": percentiles_ms(latencies),
+    }
+    return report, responses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="уже запущенный сервер (иначе - в процессе, на loopback)")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--images", type=int, default=20, help="разных кадров корпуса")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--multipart", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=config.DETECT_BATCH_SIZE)
+    parser.add_argument("--window", type=float, default=5.0, help="окно сбора пачки, мс")
+    parser.add_argument("--stub", action="store_true", help="заглушка вместо YOLO (без весов модели)")
+    parser.add_argument("--stub-delay", type=float, default=0.0, help="имитация инференса заглушки, мс на кадр")
+    parser.add_argument("--json", help="файл JSON с результатами")
+    args = parser.parse_args()
+
+    frames = [cv2.imencode(".png", img)[1].tobytes() for img, _ in iter_corpus(args.images, args.seed)]
+
+    server = detector = None
+    url = args.url
+    if url is None:
+        from server import make_server
+        if args.stub:
+            from benchmarks.stub_backend import build_stub_detector
+            detector = build_stub_detector(args.stub_delay / 1000)
+        else:
+            from core.factory import create_detector
+            detector = create_detector()
+        server = make_server(detector, port=0, batch_size=args.batch_size, window=args.window / 1000)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        report, _ = run_load(url, frames, args.requests, args.concurrency, args.multipart)
+        report["server"] = get_json(url, "/stats")
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            server.batcher.close()
+            detector.close()
+
+    latency = report["client_latency_ms"]
+    print(f"requests={report['requests']} concurrency={report['concurrency']} statuses={report['statuses']} "
+          f"throughput={report['throughput_rps']} req/s p50={latency['p50']} ms p95={latency['p95']} ms "
+          f"mean_batch={report['server']['mean_batch_size']}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+
+
+if __name__ == "__main__":
+    main()
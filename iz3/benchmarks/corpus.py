@@ -0,0 +1,190 @@
+# benchmarks/corpus.py
+"""
+Детерминированный синтетический корпус QR-изображений для бенчмарков.
+
+Каждое изображение задается только (seed, index): число кодов, размер модуля,
+поворот, перспектива, размытие, шум и фон (однотонный / градиент / "мусор"
+из прямоугольников, линий и ложных квадратов, похожих на finder patterns).
+Корпус генерируется в памяти или сохраняется в папку с manifest.json.
+
+Запуск (из папки iz3):  python -m benchmarks.corpus --out corpus --images 200 --seed 0
+"""
+import os
+import json
+import argparse
+
+import cv2
+import numpy as np
+
+# Параметры корпуса по умолчанию (попадают в manifest и в результаты бенчмарка)
+CORPUS_DEFAULTS = {
+    "width": 1280,
+    "height": 960,
+    "max_codes": 4,        # кодов на изображение: 0..max_codes
+    "min_side": 90,        # сторона кода в кадре, px
+    "max_side": 320,
+    "max_perspective": 0.12,  # смещение углов в долях стороны
+    "max_blur": 1.6,       # sigma гауссова размытия
+    "max_noise": 12.0,     # sigma гауссова шума
+}
+
+BACKGROUNDS = ("plain", "gradient", "clutter")
+
+
+def make_payload(seed, index, k):
+    return f"IZ3-{seed}-{index}-{k}"
+
+
+def encode_qr(text):
+    """QR как uint8 (1 px на модуль) с тихой зоной в 4 модуля"""
+    qr = cv2.QRCodeEncoder.create().encode(text)
+    return cv2.copyMakeBorder(qr, 2, 2, 2, 2, cv2.BORDER_CONSTANT, value=255)
+
+
+def _background(rng, kind, width, height):
+    if kind == "plain":
+        img = np.empty((height, width, 3), dtype=np.uint8)
+        img[:] = rng.integers(170, 256, 3)
+        return img
+
+    if kind == "gradient":
+        c0, c1 = rng.integers(120, 256, 3), rng.integers(60, 256, 3)
+        t = np.linspace(0, 1, width, dtype=np.float32)[None, :, None]
+        row = (c0 * (1 - t) + c1 * t).astype(np.uint8)
+        return np.ascontiguousarray(np.broadcast_to(row, (height, width, 3)))
+
+    # clutter: прямоугольники, линии и ложные "квадраты в квадрате"
+    img = _background(rng, "gradient", width, height)
+    for _ in range(int(rng.integers(20, 60))):
+        x, y = int(rng.integers(0, width)), int(rng.integers(0, height))
+        w, h = int(rng.integers(10, 200)), int(rng.integers(10, 200))
+        color = tuple(int(c) for c in rng.integers(0, 256, 3))
+        if rng.random() < 0.5:
+            cv2.rectangle(img, (x, y), (x + w, y + h), color, -1)
+        else:
+            cv2.line(img, (x, y), (x + w, y + h), color, int(rng.integers(1, 6)))
+    for _ in range(int(rng.integers(2, 8))):
+        s = int(rng.integers(12, 50))
+        x, y = int(rng.integers(0, width - s)), int(rng.integers(0, height - s))
+        cv2.rectangle(img, (x, y), (x + s, y + s), (0, 0, 0), -1)
+        cv2.rectangle(img, (x + s // 7, y + s // 7), (x + s - s // 7, y + s - s // 7), (255, 255, 255), -1)
+        cv2.rectangle(img, (x + 2 * s // 7, y + 2 * s // 7), (x + s - 2 * s // 7, y + s - 2 * s // 7), (0, 0, 0), -1)
+    return img
+
+
+def _placement(rng, params, placed):
+    """Четырехугольник кода в кадре (поворот + перспектива), без пересечения с уже размещенными"""
+    width, height = params["width"], params["height"]
+    for _ in range(50):
+        side = rng.uniform(params["min_side"], params["max_side"])
+        angle = rng.uniform(0, 2 * np.pi)
+        half = side / 2
+        reach = half * np.sqrt(2) * (1 + params["max_perspective"])
+        if 2 * reach >= min(width, height): continue
+
+        center = rng.uniform([reach, reach], [width - reach, height - reach])
+        corners = np.array([[-half, -half], [half, -half], [half, half], [-half, half]])
+        corners += rng.uniform(-1, 1, (4, 2)) * params["max_perspective"] * side
+        rot = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+        quad = corners @ rot.T + center
+
+        x0, y0 = quad.min(axis=0)
+        x1, y1 = quad.max(axis=0)
+        if all(x1 < a0 or x0 > a1 or y1 < b0 or y0 > b1 for a0, b0, a1, b1 in placed):
+            placed.append((x0, y0, x1, y1))
+            return quad.astype(np.float32), float(side), float(np.degrees(angle))
+    return None
+
+
+def make_image(seed, index, params=None):
+    """
+    Одно изображение корпуса: (BGR, описание) - описание содержит payloads,
+    четырехугольники кодов и параметры искажений.
+    """
+    params = {**CORPUS_DEFAULTS, **(params or {})}
+    rng = np.random.default_rng([seed, index])
+    width, height = params["width"], params["height"]
+
+    background = BACKGROUNDS[int(rng.integers(len(BACKGROUNDS)))]
+    img = _background(rng, background, width, height)
+
+    codes, placed = [], []
+    for k in range(int(rng.integers(0, params["max_codes"] + 1))):
+        placement = _placement(rng, params, placed)
+        if placement is None: break
+        quad, side, angle = placement
+
+        text = make_payload(seed, index, k)
+        qr = encode_qr(text)
+        n = qr.shape[0]
+        src = np.array([[0, 0], [n, 0], [n, n], [0, n]], dtype=np.float32)
+        matrix = cv2.getPerspectiveTransform(src, quad)
+        warped = cv2.warpPerspective(cv2.cvtColor(qr, cv2.COLOR_GRAY2BGR), matrix, (width, height),
+                                     flags=cv2.INTER_LINEAR, borderValue=(255, 255, 255))
+        mask = cv2.warpPerspective(np.full((n, n), 255, np.uint8), matrix, (width, height),
+                                   flags=cv2.INTER_NEAREST)
+        img[mask > 0] = warped[mask > 0]
+        codes.append({"text": text, "quad": quad.round(1).tolist(), "side": round(side, 1), "angle": round(angle, 1)})
+
+    blur = float(rng.uniform(0, params["max_blur"]))
+    if blur > 0.3:
+        img = cv2.GaussianBlur(img, (0, 0), blur)
+    noise = float(rng.uniform(0, params["max_noise"]))
+    if noise > 0:
+        img = np.clip(img + rng.normal(0, noise, img.shape), 0, 255).astype(np.uint8)
+
+    info = {"index": index, "background": background, "blur": round(blur, 3), "noise": round(noise, 3),
+            "codes": codes}
+    return img, info
+
+
+def iter_corpus(n_images, seed=0, params=None):
+    for index in range(n_images):
+        yield make_image(seed, index, params)
+
+
+def save_corpus(out_dir, n_images, seed=0, params=None):
+    """Сохраняет PNG и manifest.json (seed, параметры, описание каждого изображения)"""
+    os.makedirs(out_dir, exist_ok=True)
+    entries = []
+    for img, info in iter_corpus(n_images, seed, params):
+        name = f"{info['index']:05d}.png"
+        cv2.imwrite(os.path.join(out_dir, name), img)
+        entries.append({"file": name, **info})
+
+    manifest = {"seed": seed, "params": {**CORPUS_DEFAULTS, **(params or {})}, "images": entries}
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    return manifest
+
+
+def load_corpus(corpus_dir):
+    """Читает сохраненный корпус: manifest и генератор (BGR, описание)"""
+    with open(os.path.join(corpus_dir, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    def images():
+        for entry in manifest["images"]:
+            img = cv2.imread(os.path.join(corpus_dir, entry["file"]), cv2.IMREAD_COLOR)
+            yield img, entry
+    return manifest, images()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--out", required=True, help="папка корпуса")
+    parser.add_argument("--images", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--width", type=int, default=CORPUS_DEFAULTS["width"])
+    parser.add_argument("--height", type=int, default=CORPUS_DEFAULTS["height"])
+    parser.add_argument("--max-codes", type=int, default=CORPUS_DEFAULTS["max_codes"])
+    args = parser.parse_args()
+
+    params = {"width": args.width, "height": args.height, "max_codes": args.max_codes}
+    manifest = save_corpus(args.out, args.images, args.seed, params)
+    total = sum(len(e["codes"]) for e in manifest["images"])
+    print(f"[SYSTEM] Corpus saved: {args.out} ({args.images} images, {total} codes, seed={args.seed})")
+
+
+if __name__ == "__main__":
+    main()
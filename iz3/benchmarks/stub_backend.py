@@ -0,0 +1,51 @@
+# benchmarks/stub_backend.py
+"""
+Заглушка бэкенда YOLO для прогонов без весов модели (loopback-тест сервера, CI).
+
+Вместо нейросети углы кодов ищет cv2.QRCodeDetector, из них достраиваются боксы
+трех finder patterns - дальше работает обычный конвейер QRDetector (группировка,
+выпрямление, каскад декодеров). Точность ниже настоящей модели, зато путь
+HTTP -> микро-пакетирование -> detect_batch проверяется целиком.
+"""
+import time
+
+import cv2
+import numpy as np
+
+# Модулей на сторону кода, по которым оценивается положение finder patterns (версия 1)
+STUB_MODULES = 21
+
+
+class StubBackend:
+    name = "stub"
+
+    def __init__(self, delay=0.0):
+        # Имитация времени инференса на кадр, сек
+        self.delay = delay
+        self._detector = cv2.QRCodeDetector()
+
+    def predict(self, images):
+        if self.delay: time.sleep(self.delay * len(images))
+        return [self._finder_boxes(img) for img in images]
+
+    def _finder_boxes(self, image):
+        ok, quads = self._detector.detectMulti(image)
+        boxes_list, conf_list = [], []
+        if not ok or quads is None: return boxes_list, conf_list
+
+        for tl, tr, _, bl in quads.astype(np.float32):
+            right, down = (tr - tl) / STUB_MODULES, (bl - tl) / STUB_MODULES
+            # Центры паттернов - в 3.5 модулях от углов, бокс - 7 модулей
+            half = 3.5 * max(np.linalg.norm(right), np.linalg.norm(down))
+            for center in (tl + 3.5 * (right + down), tr + 3.5 * (down - right), bl + 3.5 * (right - down)):
+                boxes_list.append(np.round([center[0] - half, center[1] - half,
+                                            center[0] + half, center[1] + half]).astype(int))
+                conf_list.append(0.9)
+        return boxes_list, conf_list
+
+
+def build_stub_detector(delay=0.0, **kwargs):
+    """QRDetector на заглушке: без весов, только декодеры OpenCV (QReader и torch не нужны)"""
+    from core.detector import QRDetector
+    kwargs.setdefault("decoders", ("cv2", "cv2_bin"))
+    return QRDetector("stub", backend=StubBackend(delay), **kwargs)
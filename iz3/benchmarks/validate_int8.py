@@ -0,0 +1,119 @@
+# benchmarks/validate_int8.py
+"""
+Проверка INT8-профиля против FP32 на валидационной папке:
+recall детекции (боксы FP32, найденные INT8 при IoU >= порога),
+совпадение групп group_finder_patterns и задержка обоих вариантов.
+
+Запуск (из папки iz3):
+    python -m benchmarks.validate_int8 --model path/to/best.pt --images path/to/val --min-recall 0.97
+Код возврата 1, если recall или совпадение групп ниже заданных порогов.
+"""
+import sys
+import time
+import argparse
+
+import numpy as np
+
+from core.backends import create_backend
+from core.grouping import group_finder_patterns
+from core.quantize import int8_path, list_images, read_image
+
+
+def box_iou(a, b):
+    """Матрица IoU для боксов xyxy: a (n, 4), b (m, 4)"""
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float64).reshape(-1, 4)
+    lt = np.maximum(a[:, None, :2], b[None, :, :2])
+    rb = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.clip(rb - lt, 0, None).prod(axis=2)
+    area_a = (a[:, 2:] - a[:, :2]).prod(axis=1)
+    area_b = (b[:, 2:] - b[:, :2]).prod(axis=1)
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+
+def matched_count(reference, candidate, iou_thres):
+    """Жадное сопоставление один-к-одному по убыванию IoU"""
+    if not len(reference) or not len(candidate): return 0
+    iou = box_iou(reference, candidate)
+    matched = 0
+    while True:
+        i, j = np.unravel_index(np.argmax(iou), iou.shape)
+        if iou[i, j] < iou_thres: return matched
+        matched += 1
+        iou[i, :] = -1
+        iou[:, j] = -1
+
+
+def same_group(g1, g2, tol):
+    p1 = np.array(sorted(g1['points']))
+    p2 = np.array(sorted(g2['points']))
+    return np.abs(p1 - p2).max() <= tol
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", required=True, help="best.pt (INT8 ищется рядом: best.int8.onnx)")
+    parser.add_argument("--images", required=True, help="валидационная папка")
+    parser.add_argument("--reference", default="onnxruntime", help="бэкенд FP32: onnxruntime или ultralytics")
+    parser.add_argument("--runtime", default="onnxruntime", help="бэкенд INT8: onnxruntime или openvino")
+    parser.add_argument("--iou", type=float, default=0.5)
+    parser.add_argument("--group-tol", type=int, default=3, help="допуск центров паттернов, px")
+    parser.add_argument("--min-recall", type=float, default=0.0)
+    parser.add_argument("--min-group-agreement", type=float, default=0.0)
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args()
+
+    fp32 = create_backend(args.reference, args.model)
+    int8 = create_backend(args.runtime, int8_path(args.model))
+
+    ref_boxes = cand_boxes = matched = 0
+    ref_groups = agreed_groups = 0
+    t_fp32, t_int8 = [], []
+
+    for path in list_images(args.images, args.limit):
+        img = read_image(path)
+        if img is None: continue
+
+        t0 = time.perf_counter()
+        b32, c32 = fp32.predict([img])[0]
+        t1 = time.perf_counter()
+        b8, c8 = int8.predict([img])[0]
+        t2 = time.perf_counter()
+        t_fp32.append(t1 - t0)
+        t_int8.append(t2 - t1)
+
+        ref_boxes += len(b32)
+        cand_boxes += len(b8)
+        matched += matched_count(b32, b8, args.iou)
+
+        g32 = group_finder_patterns(b32, c32)
+        g8 = group_finder_patterns(b8, c8)
+        ref_groups += len(g32)
+        agreed_groups += sum(any(same_group(g, h, args.group_tol) for h in g8) for g in g32)
+
+    if not t_fp32:
+        print("No images found")
+        return 1
+
+    recall = matched / ref_boxes if ref_boxes else 1.0
+    precision = matched / cand_boxes if cand_boxes else 1.0
+    agreement = agreed_groups / ref_groups if ref_groups else 1.0
+    speedup = np.mean(t_fp32) / np.mean(t_int8)
+
+    print(f"images:           {len(t_fp32)}")
+    print(f"boxes fp32/int8:  {ref_boxes} / {cand_boxes}")
+    print(f"recall@{args.iou:.2f}:      {recall:.4f}")
+    print(f"precision@{args.iou:.2f}:   {precision:.4f}")
+    print(f"group agreement:  {agreement:.4f} ({agreed_groups}/{ref_groups})")
+    print(f"latency fp32:     {np.mean(t_fp32) * 1000:.2f} ms")
+    print(f"latency int8:     {np.mean(t_int8) * 1000:.2f} ms ({speedup:.2f}x)")
+
+    if recall < args.min_recall or agreement < args.min_group_agreement:
+        print("[FAIL] INT8 profile is below the accuracy guardrail")
+        return 1
+    print("[OK] INT8 profile passes the accuracy guardrail")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
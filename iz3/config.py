@@ -4,6 +4,72 @@ import os
 # Укажите актуальный путь к вашей модели
 MODEL_PATH = r"D:/для питона/pythonProject1/iz3/iz3/runs/detect/qr_model7/weights/best.pt"
 
-# Проверка существования модели (опционально)
-if not os.path.exists(MODEL_PATH):
-    print(f"[WARNING] Model not found at: {MODEL_PATH}")
\ No newline at end of file
+# Сколько изображений из папки отправлять в YOLO одной пачкой
+DETECT_BATCH_SIZE = 8
+
+# Бэкенд инференса YOLO: "ultralytics" (PyTorch), "onnxruntime" или "openvino".
+# Для ONNX-бэкендов best.pt один раз экспортируется в best.onnx рядом с весами.
+INFERENCE_BACKEND = "ultralytics"
+# Потоки CPU для onnxruntime/OpenVINO (0 - по умолчанию рантайма)
+INFERENCE_THREADS = 0
+# Профиль модели: "fp32" или "int8" (best.int8.onnx, см. python -m core.quantize)
+MODEL_PROFILE = "fp32"
+
+# Тайловая детекция для очень больших кадров (4K/8K, весь рабочий стол):
+# кадры с длинной стороной >= TILE_MIN_SIDE режутся на тайлы TILE_SIZE px
+# с перекрытием TILE_OVERLAP (доля тайла, должна быть больше размера finder pattern).
+# TILE_SIZE = 0 - отключено (по умолчанию; для 4K/8K - например, 1280)
+TILE_SIZE = 0
+TILE_OVERLAP = 0.2
+TILE_MIN_SIDE = 2560
+
+# Грубый проход для больших кадров камеры: YOLO работает на копии с длинной
+# стороной COARSE_SIDE px, декодирование - на вырезах из полного кадра.
+# 0 - отключено (кадры, подходящие под тайлы, все равно идут через тайлы)
+COARSE_SIDE = 0
+
+# Кэш декодированных QR по положению и хэшу выпрямленной области кода
+# (для повторяющихся кадров камеры/экрана). 0 - отключен
+DECODE_CACHE_SIZE = 0
+
+# Каскад декодеров, от дешевых к дорогим (см. core/decoders.py):
+# "cv2", "cv2_bin", "qreader", "qreader_rotated"
+DECODER_CASCADE = ("cv2", "cv2_bin", "qreader", "qreader_rotated")
+
+# Потоки для параллельного декодирования нескольких QR одного кадра (0 - последовательно, по умолчанию).
+# Пул создается в каждой реплике DetectorPool и в каждом процессе детекции, то есть потоков
+# получается DETECTOR_REPLICAS x DECODE_WORKERS на процесс; для кадров со многими кодами - например, 4
+DECODE_WORKERS = 0
+
+# Реплики детектора для одновременных источников (GUI, IP-камера, монитор экрана):
+# 1 - все вызовы идут по очереди через один исполнитель; каждая реплика грузит свои модели.
+# INFERENCE_THREADS задает потоки на реплику (ONNX-сессия и intra-op потоки torch)
+DETECTOR_REPLICAS = 1
+
+# Папка данных пользователя (рядом с настройками QSettings организации EliteQR)
+if os.name == "nt":
+    USER_DATA_DIR = os.path.join(os.environ.get("APPDATA") or os.path.expanduser("~"), "EliteQR")
+else:
+    USER_DATA_DIR = os.path.join(os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share"), "EliteQR")
+
+# Самонастройка перебора поворотов: статистика успехов стратегий (угол x предобработка)
+# сохраняется между сессиями; за один вырез пробуется не больше ROTATED_MAX_ATTEMPTS стратегий
+DECODE_STRATEGY_PATH = os.path.join(USER_DATA_DIR, "decode_strategies.json")
+ROTATED_MAX_ATTEMPTS = 6
+
+# Бюджет декодирования кадра в живом режиме (IP-камера), сек, отсчитывается после YOLO:
+# после него декодирование прекращается, группы остаются "найденными, но не декодированными"
+# (None - без ограничения)
+LIVE_DECODE_BUDGET = 0.15
+
+# Многопроцессный режим IP-камеры: захват и детекция в отдельных процессах, кадры
+# передаются через кольцевой буфер в разделяемой памяти, GUI только рисует.
+# Каждый процесс детекции грузит свою модель. MULTIPROCESS_FRAME_BYTES - размер слота (макс. кадр)
+MULTIPROCESS_DETECTION = False
+DETECTOR_PROCESSES = 2
+MULTIPROCESS_FRAME_BYTES = 3840 * 2160 * 3
+
+# Проверка существования модели (опционально): для int8 грузится только best.int8.onnx
+_model_file = os.path.splitext(MODEL_PATH)[0] + ".int8.onnx" if MODEL_PROFILE == "int8" else MODEL_PATH
+if not os.path.exists(_model_file):
+    print(f"[WARNING] Model not found at: {_model_file}")
\ No newline at end of file
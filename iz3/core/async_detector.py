@@ -0,0 +1,91 @@
+# core/async_detector.py
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncQRDetector:
+    """
+    asyncio-фасад над QRDetector / DetectorPool.
+
+    await detect(image) -> DetectionBatch; async for result in detect_stream(frames).
+    Запросы, пришедшие в пределах batch_window секунд, собираются в один вызов
+    detect_batch (до batch_size кадров), который выполняется в пуле потоков,
+    поэтому много мелких ожидающих получают пропускную способность пакетного YOLO.
+    Одновременно в работе не больше max_in_flight запросов, остальные ждут (backpressure).
+    """
+
+    def __init__(self, detector, max_in_flight=32, batch_size=8, batch_window=0.005, executor=None):
+        self.detector = detector
+        self.max_in_flight = max_in_flight
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        # По потоку на реплику пула: пачки на разных репликах идут параллельно
+        workers = len(getattr(detector, "replicas", [detector]))
+        self._own_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=workers, thread_name_prefix="qr-async")
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._pending = []
+        self._flush_handle = None
+
+    async def detect(self, image_bgr):
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending.append((image_bgr, future))
+
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.batch_window, self._flush)
+            return await future
+
+    def _flush(self):
+        """Отправляет накопленные запросы одной пачкой в detect_batch"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending: return
+
+        batch, self._pending = self._pending, []
+        loop = asyncio.get_running_loop()
+        task = loop.run_in_executor(self._executor, self.detector.detect_batch,
+                                    [image for image, _ in batch], self.batch_size)
+
+        def deliver(done):
+            error = done.exception()
+            results = None if error else done.result()
+            for i, (_, future) in enumerate(batch):
+                if future.done(): continue  # ожидающий отменен
+                if error: future.set_exception(error)
+                else: future.set_result(results[i])
+
+        task.add_done_callback(deliver)
+
+    async def detect_stream(self, frames):
+        """
+        Результаты для потока кадров (обычный или асинхронный итератор) в порядке кадров.
+        Новые кадры не читаются, пока в работе max_in_flight кадров.
+        """
+        in_flight = deque()
+
+        async def consume():
+            if hasattr(frames, "__aiter__"):
+                async for frame in frames: yield frame
+            else:
+                for frame in frames: yield frame
+
+        try:
+            async for frame in consume():
+                in_flight.append(asyncio.ensure_future(self.detect(frame)))
+                if len(in_flight) >= self.max_in_flight:
+                    yield await in_flight.popleft()
+            while in_flight:
+                yield await in_flight.popleft()
+        finally:
+            for task in in_flight: task.cancel()
+
+    async def close(self):
+        self._flush()
+        if self._own_executor:
+            await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown, True)
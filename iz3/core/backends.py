@@ -0,0 +1,204 @@
+# core/backends.py
+"""
+Бэкенды инференса YOLO-модели finder patterns.
+
+Все бэкенды возвращают для каждого кадра пару (boxes_list, conf_list) в том же
+виде, что и прежний разбор результатов ultralytics: боксы xyxy (int) и уверенности.
+"""
+import os
+import ast
+
+import cv2
+import numpy as np
+
+
+class UltralyticsBackend:
+    """PyTorch-модель через ultralytics (исходный путь)"""
+    name = "ultralytics"
+
+    def __init__(self, model_path, conf=0.25):
+        from ultralytics import YOLO
+        self.model = YOLO(model_path)
+        self.conf = conf
+
+    def predict(self, images):
+        results = self.model(list(images), conf=self.conf, verbose=False)
+        return [self._extract_boxes(r) for r in results]
+
+    @staticmethod
+    def _extract_boxes(result):
+        """Переводит результат YOLO для одного кадра в списки боксов и уверенностей"""
+        boxes_list = []
+        conf_list = []
+
+        if result is not None and result.boxes:
+            for box in result.boxes:
+                boxes_list.append(box.xyxy[0].cpu().numpy().astype(int))
+                conf_list.append(float(box.conf[0].cpu().numpy()))
+        return boxes_list, conf_list
+
+
+def export_onnx(model_path):
+    """
+    Экспортирует best.pt в ONNX один раз и кладет рядом с весами (best.onnx).
+    Если экспорт свежее весов, повторно не выполняется.
+    """
+    onnx_path = os.path.splitext(model_path)[0] + ".onnx"
+    if os.path.exists(onnx_path) and os.path.getmtime(onnx_path) >= os.path.getmtime(model_path):
+        return onnx_path
+
+    from ultralytics import YOLO
+    # dynamic=True: вход любого размера и батча, letterbox как у PyTorch-пути
+    exported = YOLO(model_path).export(format="onnx", dynamic=True, simplify=True, verbose=False)
+    if os.path.abspath(exported) != os.path.abspath(onnx_path):
+        os.replace(exported, onnx_path)
+    print(f"[SYSTEM] ONNX export cached: {onnx_path}")
+    return onnx_path
+
+
+def read_metadata(onnx_path):
+    """imgsz и stride из метаданных, которые ultralytics пишет в ONNX"""
+    imgsz, stride = 640, 32
+    try:
+        import onnx
+        meta = {p.key: p.value for p in onnx.load(onnx_path, load_external_data=False).metadata_props}
+        if "imgsz" in meta:
+            size = ast.literal_eval(meta["imgsz"])
+            imgsz = max(size) if isinstance(size, (list, tuple)) else int(size)
+        if "stride" in meta:
+            stride = int(meta["stride"])
+    except Exception as e:
+        print(f"[WARNING] ONNX metadata not read ({e}), using imgsz={imgsz}, stride={stride}")
+    return imgsz, stride
+
+
+def letterbox(image, new_shape=640, stride=32, color=(114, 114, 114)):
+    """
+    Повторяет LetterBox из ultralytics (auto=True): масштаб по длинной стороне
+    и минимальные поля до кратности stride.
+    """
+    shape = image.shape[:2]
+    r = min(new_shape / shape[0], new_shape / shape[1])
+    new_unpad = (int(round(shape[1] * r)), int(round(shape[0] * r)))
+    dw = np.mod(new_shape - new_unpad[0], stride) / 2
+    dh = np.mod(new_shape - new_unpad[1], stride) / 2
+
+    if shape[::-1] != new_unpad:
+        image = cv2.resize(image, new_unpad, interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+    left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+    image = cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=color)
+    return image
+
+
+def make_blob(letterboxed):
+    """Список letterbox-кадров (BGR, HWC, uint8) -> входной тензор NCHW float32 RGB 0..1"""
+    blob = np.stack([lb[..., ::-1].transpose(2, 0, 1) for lb in letterboxed])
+    return np.ascontiguousarray(blob, dtype=np.float32) / 255.0
+
+
+def nms(boxes, scores, iou_thres):
+    """Жадный NMS как torchvision.ops.nms; boxes уже отсортированы по убыванию scores"""
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = np.arange(len(scores))
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        xx1 = np.maximum(x1[i], x1[order[1:]])
+        yy1 = np.maximum(y1[i], y1[order[1:]])
+        xx2 = np.minimum(x2[i], x2[order[1:]])
+        yy2 = np.minimum(y2[i], y2[order[1:]])
+        inter = np.clip(xx2 - xx1, 0, None) * np.clip(yy2 - yy1, 0, None)
+        iou = inter / (areas[i] + areas[order[1:]] - inter)
+        order = order[1:][iou <= iou_thres]
+    return np.array(keep, dtype=np.int64)
+
+
+class OnnxBackend:
+    """
+    ONNX-экспорт модели через onnxruntime или OpenVINO (CPU).
+    Предобработка (letterbox) и постобработка (NMS, масштабирование боксов)
+    повторяют ultralytics, поэтому боксы совпадают с PyTorch-бэкендом.
+    """
+
+    def __init__(self, model_path, conf=0.25, iou=0.7, max_det=300, runtime="onnxruntime", threads=0):
+        self.conf = conf
+        self.iou = iou
+        self.max_det = max_det
+        self.name = runtime
+        self.onnx_path = model_path if model_path.endswith(".onnx") else export_onnx(model_path)
+        self.imgsz, self.stride = read_metadata(self.onnx_path)
+
+        if runtime == "openvino":
+            import openvino as ov
+            core = ov.Core()
+            config = {"INFERENCE_NUM_THREADS": threads} if threads else {}
+            compiled = core.compile_model(self.onnx_path, "CPU", config)
+            output = compiled.output(0)
+            self._infer = lambda x: compiled([x])[output]
+        elif runtime == "onnxruntime":
+            import onnxruntime as ort
+            options = ort.SessionOptions()
+            if threads:
+                options.intra_op_num_threads = threads
+            session = ort.InferenceSession(self.onnx_path, options, providers=["CPUExecutionProvider"])
+            input_name = session.get_inputs()[0].name
+            self._infer = lambda x: session.run(None, {input_name: x})[0]
+        else:
+            raise ValueError(f"Unknown ONNX runtime: {runtime}")
+
+    def predict(self, images):
+        outputs = [None] * len(images)
+
+        # Кадры с одинаковым размером после letterbox идут в сеть одним батчем
+        prepared = {}
+        for idx, img in enumerate(images):
+            lb = letterbox(img, self.imgsz, self.stride)
+            prepared.setdefault(lb.shape, []).append((idx, lb))
+
+        for items in prepared.values():
+            preds = self._infer(make_blob([lb for _, lb in items]))
+            for (idx, lb), pred in zip(items, preds):
+                outputs[idx] = self._postprocess(pred, lb.shape[:2], images[idx].shape[:2])
+        return outputs
+
+    def _postprocess(self, pred, lb_shape, img_shape):
+        # YOLOv8: (4 + nc, N) -> (N, 4 + nc), первые 4 - cx, cy, w, h
+        pred = pred.T
+        cls_scores = pred[:, 4:]
+        scores = cls_scores.max(1)
+        mask = scores > self.conf
+        if not mask.any(): return [], []
+
+        pred, scores, cls = pred[mask], scores[mask], cls_scores[mask].argmax(1)
+        cx, cy, w, h = pred[:, 0], pred[:, 1], pred[:, 2], pred[:, 3]
+        boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+
+        order = np.argsort(-scores, kind="stable")
+        boxes, scores, cls = boxes[order], scores[order], cls[order]
+        # Смещение по классу, чтобы NMS не подавлял боксы разных классов
+        keep = nms(boxes + (cls * 7680)[:, None], scores, self.iou)[:self.max_det]
+        boxes, scores = boxes[keep], scores[keep]
+
+        # Обратно в координаты исходного кадра (как scale_boxes в ultralytics)
+        gain = min(lb_shape[0] / img_shape[0], lb_shape[1] / img_shape[1])
+        pad_x = round((lb_shape[1] - img_shape[1] * gain) / 2 - 0.1)
+        pad_y = round((lb_shape[0] - img_shape[0] * gain) / 2 - 0.1)
+        boxes[:, [0, 2]] -= pad_x
+        boxes[:, [1, 3]] -= pad_y
+        boxes /= gain
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, img_shape[1])
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, img_shape[0])
+
+        return [b.astype(int) for b in boxes], [float(s) for s in scores]
+
+
+def create_backend(name, model_path, conf=0.25, threads=0):
+    """Фабрика бэкендов по имени из конфига: ultralytics / onnxruntime / openvino"""
+    if name == "ultralytics":
+        return UltralyticsBackend(model_path, conf=conf)
+    if name in ("onnxruntime", "openvino"):
+        return OnnxBackend(model_path, conf=conf, runtime=name, threads=threads)
+    raise ValueError(f"Unknown inference backend: {name}")
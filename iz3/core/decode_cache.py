@@ -0,0 +1,79 @@
+# core/decode_cache.py
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+class DecodeCache:
+    """
+    LRU-кэш декодированных QR по положению кода и хэшу его выпрямленной области.
+    Один и тот же код в одном месте кадра (IP-камера, монитор экрана)
+    дает тот же ключ, и повторный вызов QReader не нужен.
+    """
+
+    def __init__(self, max_size=256, hash_size=64, geometry_step=8):
+        self.max_size = max_size
+        # Сторона бинарного хэша области кода: должна быть больше числа модулей
+        # QR, иначе модули данных усредняются и разные коды совпадают
+        self.hash_size = hash_size
+        # Шаг квантования углов кода, px
+        self.geometry_step = geometry_step
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def make_key(self, code_area, quad=None):
+        """
+        Ключ = квантованные углы кода (quad, 4x2) + бинарный хэш только области кода:
+        выпрямленная область сжимается до hash_size x hash_size и порогуется по Оцу,
+        так что каждый модуль дает свои биты.
+        """
+        if code_area is None or code_area.size == 0 or self.max_size <= 0: return None
+        gray = cv2.cvtColor(code_area, cv2.COLOR_BGR2GRAY) if code_area.ndim == 3 else code_area
+        small = cv2.resize(gray, (self.hash_size, self.hash_size), interpolation=cv2.INTER_AREA)
+        _, bits = cv2.threshold(small, 0, 1, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        key = np.packbits(bits).tobytes()
+        if quad is not None:
+            key = np.round(np.asarray(quad) / self.geometry_step).astype(np.int32).tobytes() + key
+        return key
+
+    def get(self, key):
+        if key is None or self.max_size <= 0: return None
+        with self._lock:
+            text = self._items.get(key)
+            if text is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return text
+
+    def put(self, key, text):
+        if key is None or not text or self.max_size <= 0: return
+        with self._lock:
+            self._items[key] = text
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self):
+        """Счетчики для подбора размера кэша"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._items),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0
+            }
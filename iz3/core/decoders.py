@@ -0,0 +1,212 @@
+# core/decoders.py
+"""
+Дешевые декодеры для каскада: встроенный cv2.QRCodeDetector на выпрямленном QR
+и он же на бинаризованном изображении. QReader остается последней ступенью.
+"""
+import os
+import json
+import threading
+
+import cv2
+
+# Порядок ступеней каскада по умолчанию (от дешевой к дорогой):
+#   cv2             - cv2.QRCodeDetector на выпрямленном QR
+#   cv2_bin         - то же на бинаризации Оцу
+#   qreader         - QReader на выпрямленном QR
+#   qreader_rotated - прежний перебор поворотов/порога QReader на вырезе
+DECODE_TIERS = ("cv2", "cv2_bin", "qreader", "qreader_rotated")
+
+
+def binarize(image):
+    """Серое + порог Оцу (после легкого сглаживания шума)"""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    gray = cv2.GaussianBlur(gray, (3, 3), 0)
+    _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return thresh
+
+
+def clahe(image):
+    """Серое + локальное выравнивание контраста (блики, неравномерный свет)"""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    return cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8)).apply(gray)
+
+
+def preprocess(image, prep):
+    """
+    Предобработка для попытки QReader:
+      rgb    - как есть (BGR -> RGB)
+      thresh - адаптивный гауссов порог
+      otsu   - порог Оцу (binarize)
+      clahe  - выравнивание контраста
+    """
+    if prep == "rgb":
+        return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    if prep == "thresh":
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
+    if prep == "otsu":
+        return binarize(image)
+    if prep == "clahe":
+        return clahe(image)
+    raise ValueError(f"Unknown preprocessing: {prep}")
+
+
+class CvQRDecoder:
+    """cv2.QRCodeDetector - свой экземпляр на поток (детектор OpenCV хранит состояние)"""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def decode(self, image):
+        if image is None: return None
+        detector = getattr(self._local, "detector", None)
+        if detector is None:
+            detector = self._local.detector = cv2.QRCodeDetector()
+        try:
+            text, _, _ = detector.detectAndDecode(image)
+        except cv2.error:
+            return None
+        return text or None
+
+
+class DecodeStats:
+    """Потокобезопасные счетчики по ступеням каскада: попытки, успехи, время, пропуски по бюджету"""
+
+    def __init__(self, tiers=DECODE_TIERS):
+        self._lock = threading.Lock()
+        self._tiers = list(tiers)
+        self._data = {}
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._data = {t: {"attempts": 0, "hits": 0, "time": 0.0, "skipped": 0} for t in self._tiers}
+
+    def _row(self, tier):
+        return self._data.setdefault(tier, {"attempts": 0, "hits": 0, "time": 0.0, "skipped": 0})
+
+    def record(self, tier, hit, seconds):
+        with self._lock:
+            row = self._row(tier)
+            row["attempts"] += 1
+            row["hits"] += int(bool(hit))
+            row["time"] += seconds
+
+    def record_skip(self, tier):
+        """Ступень пропущена по бюджету; возвращает число пропусков"""
+        with self._lock:
+            row = self._row(tier)
+            row["skipped"] += 1
+            return row["skipped"]
+
+    def snapshot(self):
+        """
+        {ступень: attempts, hits, hit_rate, share (доля всех успешных декодов),
+        total_ms, mean_ms, skipped}
+        """
+        with self._lock:
+            total_hits = sum(r["hits"] for r in self._data.values())
+            report = {}
+            for tier, r in self._data.items():
+                report[tier] = {
+                    "attempts": r["attempts"],
+                    "hits": r["hits"],
+                    "hit_rate": round(r["hits"] / r["attempts"], 4) if r["attempts"] else 0.0,
+                    "share": round(r["hits"] / total_hits, 4) if total_hits else 0.0,
+                    "total_ms": round(r["time"] * 1000, 2),
+                    "mean_ms": round(r["time"] * 1000 / r["attempts"], 2) if r["attempts"] else 0.0,
+                    "skipped": r["skipped"]
+                }
+            return report
+
+
+class StrategyStats:
+    """
+    Счетчики успехов стратегий перебора (угол x предобработка) для try_decode_rotated.
+    Порядок попыток - по сглаженной доле успехов (hits + 1) / (attempts + 2):
+    у неопробованной стратегии 0.5, поэтому она поднимается, когда лидеры
+    начинают ошибаться. Статистика сохраняется в JSON между сессиями
+    (save() - при закрытии детектора, не из потоков декодирования).
+    """
+    # При таком числе попыток стратегии счетчики делятся пополам,
+    # чтобы порядок успевал за изменением трафика
+    DECAY_AT = 10000
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = {}
+        self._decoded = 0
+        self._attempts_to_decode = 0
+        self._dirty = 0
+        if path: self.load()
+
+    @staticmethod
+    def key(step):
+        return f"{step[0]}.{step[1]}"
+
+    def _score(self, step):
+        row = self._data.get(self.key(step))
+        if row is None: return 0.5
+        return (row["hits"] + 1) / (row["attempts"] + 2)
+
+    def order(self, steps):
+        """Стратегии по убыванию ожидаемого успеха (при равенстве - исходный порядок)"""
+        with self._lock:
+            return sorted(steps, key=lambda step: -self._score(step))
+
+    def record(self, step, hit):
+        with self._lock:
+            row = self._data.setdefault(self.key(step), {"attempts": 0, "hits": 0})
+            row["attempts"] += 1
+            row["hits"] += int(bool(hit))
+            if row["attempts"] >= self.DECAY_AT:
+                for r in self._data.values():
+                    r["attempts"] //= 2
+                    r["hits"] //= 2
+            self._dirty += 1
+
+    def record_decoded(self, attempts):
+        """Код декодирован за attempts попыток (для средней длины перебора)"""
+        with self._lock:
+            self._decoded += 1
+            self._attempts_to_decode += attempts
+
+    def snapshot(self):
+        with self._lock:
+            strategies = {k: {**r, "hit_rate": round(r["hits"] / r["attempts"], 4) if r["attempts"] else 0.0}
+                          for k, r in self._data.items()}
+            mean = self._attempts_to_decode / self._decoded if self._decoded else 0.0
+            return {"strategies": strategies, "decoded": self._decoded, "mean_attempts": round(mean, 3)}
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"[WARNING] Decode strategy stats not loaded ({e})")
+            return
+        with self._lock:
+            self._data = {k: {"attempts": int(r["attempts"]), "hits": int(r["hits"])}
+                          for k, r in saved.get("strategies", {}).items()}
+            self._decoded = int(saved.get("decoded", 0))
+            self._attempts_to_decode = int(saved.get("attempts_to_decode", 0))
+
+    def save(self):
+        if not self.path: return
+        with self._lock:
+            if not self._dirty: return
+            saved = {"strategies": {k: dict(r) for k, r in self._data.items()},
+                     "decoded": self._decoded, "attempts_to_decode": self._attempts_to_decode}
+            self._dirty = 0
+            # Запись через временный файл, чтобы не оставить обрезанный JSON
+            tmp_path = self.path + ".tmp"
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(saved, f, indent=1)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"[WARNING] Decode strategy stats not saved ({e})")
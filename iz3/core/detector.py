@@ -2,136 +2,119 @@
 import os
 import cv2
 import time
+import threading
 import numpy as np
-from math import hypot
-from itertools import combinations
-from ultralytics import YOLO
-from qreader import QReader
+from concurrent.futures import ThreadPoolExecutor
+
+from core import timing
+from core.backends import create_backend
+from core.decode_cache import DecodeCache
+from core.decoders import DECODE_TIERS, CvQRDecoder, DecodeStats, StrategyStats, binarize, preprocess
+from core.quantize import int8_path
+from core.results import DetectionBatch
+from core.tiling import predict_tiled
+from core.grouping import triangle_score_py, group_finder_patterns, finder_quad
+
+# Выпрямленный QR: отступ вокруг центров finder patterns в долях стороны
+RECTIFY_MARGIN = 0.5
+# Минимальная сторона (между центрами паттернов) после выпрямления, px
+RECTIFY_MIN_SIDE = 120
+# Область кода за центрами finder patterns (3.5 модуля + запас) в долях стороны
+CODE_AREA_MARGIN = 0.3
+
+# Стратегии try_decode_rotated (угол, предобработка) в исходном порядке: первые шесть -
+# прежний перебор, остальные (270 градусов, Оцу, CLAHE) поднимаются по статистике успехов
+ROTATED_STEPS = ((0, "rgb"), (0, "thresh"), (90, "rgb"), (90, "thresh"), (180, "rgb"), (180, "thresh"),
+                 (270, "rgb"), (270, "thresh"),
+                 (0, "otsu"), (90, "otsu"), (180, "otsu"), (270, "otsu"),
+                 (0, "clahe"), (90, "clahe"), (180, "clahe"), (270, "clahe"))
+ROTATE_CODES = {90: cv2.ROTATE_90_CLOCKWISE, 180: cv2.ROTATE_180, 270: cv2.ROTATE_90_COUNTERCLOCKWISE}
+# Сколько попыток ступени нужно, чтобы доверять ее статистике при работе с бюджетом
+PAYOFF_MIN_ATTEMPTS = 20
+# Каждый такой пропуск ступени по бюджету она все же выполняется (переизмерение цены)
+BUDGET_PROBE_EVERY = 20
 
 
 class QRDetector:
-    def __init__(self, model_path):
+    def __init__(self, model_path, cache_size=0, backend="ultralytics", threads=0, profile="fp32",
+                 tile_size=0, tile_overlap=0.2, tile_min_side=2560, tile_batch=8, coarse_side=0,
+                 decoders=DECODE_TIERS, decode_workers=0, strategy_path=None, rotated_max_attempts=6):
         self.model_path = model_path
+        # backend - имя бэкенда или готовый объект с predict(images) (заглушка без весов для бенчмарков)
+        self.backend_name = backend if isinstance(backend, str) else backend.name
+        # Профиль модели: "fp32" - исходные веса, "int8" - квантизованный ONNX (core/quantize.py)
+        self.profile = profile
+        self.threads = threads
+        self.backend = None if isinstance(backend, str) else backend
         self.model = None
         self.qreader = None
+        # Тайловая детекция: кадры с длинной стороной >= tile_min_side режутся
+        # на тайлы tile_size с перекрытием tile_overlap (tile_size=0 - отключено)
+        self.tile_size = tile_size
+        self.tile_overlap = tile_overlap
+        self.tile_min_side = tile_min_side
+        self.tile_batch = tile_batch
+        # Грубый проход: YOLO на копии с длинной стороной coarse_side, вырезы для
+        # декодирования - из полного кадра (0 - отключено; тайлы имеют приоритет)
+        self.coarse_side = coarse_side
+        # Кэш уже декодированных QR (0 - отключен)
+        self.decode_cache = DecodeCache(cache_size)
+        # Каскад декодеров (см. core/decoders.py) и статистика по его ступеням
+        self.decoders = tuple(decoders)
+        self.decode_stats = DecodeStats(self.decoders)
+        self._cv_decoder = CvQRDecoder()
+        # Самонастройка перебора поворотов: порядок стратегий по накопленным успехам
+        # (сохраняются в strategy_path между сессиями), не больше rotated_max_attempts попыток
+        self.strategy_stats = StrategyStats(strategy_path)
+        self.rotated_max_attempts = rotated_max_attempts
+        # Параллельное декодирование групп одного кадра (0 - последовательно).
+        # QReader не заявлен как реентерабельный, поэтому его вызовы идут под замком,
+        # а параллельно выполняются выпрямление и дешевые декодеры OpenCV
+        self._qreader_lock = threading.Lock()
+        self._decode_pool = None
+        if decode_workers > 0:
+            self._decode_pool = ThreadPoolExecutor(max_workers=decode_workers, thread_name_prefix="qr-decode")
         self._load_model()
 
     def _load_model(self):
-        if os.path.exists(self.model_path):
-            # Загрузка YOLO модели
-            self.model = YOLO(self.model_path)
-            # Загрузка QReader для декодирования (размер 'm' - баланс скорости/точности)
-            self.qreader = QReader(model_size='m')
-            print(f"[SYSTEM] Model Loaded: {self.model_path}")
+        if self.backend is not None: return
+        model_file, backend = self.model_path, self.backend_name
+        if self.profile == "int8":
+            model_file = int8_path(self.model_path)
+            if not os.path.exists(model_file):
+                raise FileNotFoundError(f"INT8 model not found at {model_file} (run: python -m core.quantize)")
+            # INT8-модель - это ONNX, PyTorch-бэкенд ее не запускает
+            if backend == "ultralytics": backend = "onnxruntime"
+
+        # Проверяется файл, который реально грузится: для int8 хватает одного best.int8.onnx
+        if os.path.exists(model_file):
+            # Загрузка YOLO модели через выбранный бэкенд (ultralytics / onnxruntime / openvino)
+            self.backend = create_backend(backend, model_file, threads=self.threads)
+            self.model = getattr(self.backend, 'model', None)
+            print(f"[SYSTEM] Model Loaded: {model_file} ({self.backend.name}, {self.profile})")
         else:
-            raise FileNotFoundError(f"Model file not found at {self.model_path}")
+            raise FileNotFoundError(f"Model file not found at {model_file}")
+
+    def close(self):
+        """Останавливает пул потоков декодирования и сохраняет статистику стратегий"""
+        self.strategy_stats.save()
+        if self._decode_pool is not None:
+            self._decode_pool.shutdown(wait=True)
+            self._decode_pool = None
 
     def _get_triangle_score(self, boxes_indices, all_boxes):
         """
         Геометрическая проверка: образуют ли 3 квадрата (finder patterns)
         правильный треугольник, характерный для QR кода.
         """
-        idx1, idx2, idx3 = boxes_indices
-        b1, b2, b3 = all_boxes[idx1], all_boxes[idx2], all_boxes[idx3]
-
-        # 1. Проверка соотношения сторон самих боксов (они должны быть квадратными)
-        for b in [b1, b2, b3]:
-            w_box = b[2] - b[0]
-            h_box = b[3] - b[1]
-            if min(w_box, h_box) == 0: return float('inf'), None, None
-            aspect = max(w_box, h_box) / min(w_box, h_box)
-            if aspect > 1.8: return float('inf'), None, None
-
-        # 2. Проверка размеров (боксы должны быть примерно одинаковыми)
-        w1, w2, w3 = b1[2] - b1[0], b2[2] - b2[0], b3[2] - b3[0]
-        sizes = [w1, w2, w3]
-        avg_size = sum(sizes) / 3
-        max_size = max(sizes)
-        min_size = min(sizes)
-
-        if max_size > min_size * 1.5: return float('inf'), None, None
-
-        # Центры боксов
-        p1 = ((b1[0] + b1[2]) // 2, (b1[1] + b1[3]) // 2)
-        p2 = ((b2[0] + b2[2]) // 2, (b2[1] + b2[3]) // 2)
-        p3 = ((b3[0] + b3[2]) // 2, (b3[1] + b3[3]) // 2)
-        points = [p1, p2, p3]
-
-        # Расстояния между центрами
-        dists = []
-        dists.append((hypot(p1[0] - p2[0], p1[1] - p2[1]), 0, 1, 2))
-        dists.append((hypot(p1[0] - p3[0], p1[1] - p3[1]), 0, 2, 1))
-        dists.append((hypot(p2[0] - p3[0], p2[1] - p3[1]), 1, 2, 0))
-        dists.sort(key=lambda x: x[0])
-
-        short1, _, _, _ = dists[0]
-        short2, _, _, _ = dists[1]
-        long_side, _, _, corner_idx = dists[2]
-
-        if short1 == 0: return float('inf'), None, None
-
-        # 3. Проверка дистанции относительно размера паттерна
-        rel_dist = long_side / avg_size
-        if rel_dist > 15.0: return float('inf'), None, None
-
-        # Длинная сторона должна быть гипотенузой
-        if long_side < short1 or long_side < short2: return float('inf'), None, None
-
-        # Катеты должны быть примерно равны
-        ratio_legs = max(short1, short2) / min(short1, short2)
-        if ratio_legs > 2.5: return float('inf'), None, None
-
-        # 4. Проверка угла (должен быть 90 градусов, теорема косинусов)
-        cos_angle = (short1 ** 2 + short2 ** 2 - long_side ** 2) / (2 * short1 * short2)
-        angle_err = abs(cos_angle)
-        if angle_err > 0.5: return float('inf'), None, None
-
-        # Рассчет итоговой оценки (чем меньше, тем лучше)
-        size_diff = (max_size - min_size) / min_size
-        score = (size_diff * 3.0) + (angle_err * 2.0) + (rel_dist * 0.05)
-
-        return score, points[corner_idx], [p1, p2, p3]
+        return triangle_score_py(boxes_indices, all_boxes)
 
     def group_finder_patterns(self, boxes, confidences):
         """
-        Перебирает все комбинации найденных боксов по 3 штуки
-        и ищет среди них валидные QR-паттерны.
-        """
-        n = len(boxes)
-        if n < 3: return []
-        possible_groups = []
-
-        # Перебор всех троек
-        for indices in combinations(range(n), 3):
-            score, corner, pts = self._get_triangle_score(indices, boxes)
-            if score != float('inf'):
-                avg_yolo_conf = (confidences[indices[0]] + confidences[indices[1]] + confidences[indices[2]]) / 3
-
-                # Максимальный размах для определения зоны обрезки
-                max_span = max(hypot(pts[0][0] - pts[1][0], pts[0][1] - pts[1][1]),
-                               hypot(pts[1][0] - pts[2][0], pts[1][1] - pts[2][1]),
-                               hypot(pts[0][0] - pts[2][0], pts[0][1] - pts[2][1]))
-
-                possible_groups.append({
-                    'score': score,
-                    'yolo_conf': avg_yolo_conf,
-                    'indices': set(indices),
-                    'points': pts,
-                    'corner': corner,
-                    'span': max_span
-                })
-
-        # Сортируем по "геометрической идеальности"
-        possible_groups.sort(key=lambda x: x['score'])
-
-        # Убираем дубликаты (если один паттерн попал в несколько групп)
-        final_groups = []
-        used_indices = set()
-        for g in possible_groups:
-            if not g['indices'].intersection(used_indices):
-                final_groups.append(g)
-                used_indices.update(g['indices'])
-        return final_groups
+        Ищет среди найденных боксов тройки, образующие валидные QR-паттерны.
+        Все тройки оцениваются векторно (см. core/grouping.py).
+        """
+        return group_finder_patterns(boxes, confidences)
 
     def get_qr_crop(self, image, group):
         """Вырезает область с QR кодом из изображения"""
@@ -152,55 +135,266 @@ class QRDetector:
         if (x2 - x1) < 20 or (y2 - y1) < 20: return None
         return image[y1:y2, x1:x2]
 
-    def try_decode_rotated(self, roi):
-        """Пытается декодировать ROI, вращая его на 0, 90, 180 градусов"""
-        if roi is None: return None
+    def get_rectified_qr(self, image, group):
+        """
+        Выпрямляет QR по геометрии группы: центры трех finder patterns
+        и достроенный четвертый угол переводятся в квадрат (угловой паттерн
+        сверху слева), вокруг добавляется отступ под сами паттерны и тихую зону.
+        """
+        src = finder_quad(group)
+        if src is None: return None
+
+        leg = max(np.linalg.norm(src[1] - src[0]), np.linalg.norm(src[3] - src[0]))
+        if leg < 1: return None
+        side = max(int(round(leg)), RECTIFY_MIN_SIDE)
+        m = int(side * RECTIFY_MARGIN)
+        size = side + 2 * m
+
+        dst = np.array([[m, m], [m + side, m], [m + side, m + side], [m, m + side]], dtype=np.float32)
+        matrix = cv2.getPerspectiveTransform(src, dst)
+        return cv2.warpPerspective(image, matrix, (size, size), flags=cv2.INTER_LINEAR,
+                                   borderMode=cv2.BORDER_REPLICATE)
+
+    @staticmethod
+    def get_code_area(warped):
+        """Область самого кода на выпрямленном QR (без тихой зоны и отступа)"""
+        size = warped.shape[0]
+        side = size / (1 + 2 * RECTIFY_MARGIN)
+        m = (size - side) / 2
+        x1 = max(0, int(m - side * CODE_AREA_MARGIN))
+        x2 = min(size, int(round(m + side * (1 + CODE_AREA_MARGIN))))
+        return warped[x1:x2, x1:x2]
+
+    def _get_qreader(self):
+        """
+        QReader загружается при первой попытке декодирования через него (вызывается под
+        _qreader_lock): если хватает ступеней OpenCV, qreader и torch не импортируются вовсе
+        """
+        if self.qreader is None:
+            from qreader import QReader
+            t_start = time.perf_counter()
+            # Размер 'm' - баланс скорости/точности
+            self.qreader = QReader(model_size='m')
+            print(f"[SYSTEM] QReader loaded on first use ({time.perf_counter() - t_start:.2f}s)")
+        return self.qreader
 
-        rotations = [(0, roi), (90, cv2.rotate(roi, cv2.ROTATE_90_CLOCKWISE)), (180, cv2.rotate(roi, cv2.ROTATE_180))]
+    def _qreader_detect_and_decode(self, image):
+        with self._qreader_lock:
+            return self._get_qreader().detect_and_decode(image=image)
 
-        for _, img in rotations:
-            # 1. Попытка на RGB
-            rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-            decoded = self.qreader.detect_and_decode(image=rgb)
-            if decoded and decoded[0]: return decoded[0]
+    def _qreader_decode(self, img_bgr):
+        rgb = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB)
+        decoded = self._qreader_detect_and_decode(rgb)
+        if decoded and decoded[0]: return decoded[0]
+        return None
 
-            # 2. Попытка на Бинаризованном (для сложных условий)
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            thresh = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
-            decoded_bin = self.qreader.detect_and_decode(image=thresh)
-            if decoded_bin and decoded_bin[0]: return decoded_bin[0]
+    def try_decode_rectified(self, image, group):
+        """Одна попытка декодирования на выпрямленном QR (без поворотов)"""
+        warped = self.get_rectified_qr(image, group)
+        if warped is None: return None
+        return self._qreader_decode(warped)
 
+    def _tiers_by_payoff(self, stats):
+        """
+        Ступени по ожидаемой отдаче (доля успехов на мс) по накопленной статистике.
+        Переставляются только ступени, у которых не меньше PAYOFF_MIN_ATTEMPTS попыток
+        (между своими местами в self.decoders), остальные остаются на исходных местах.
+        """
+        known = [i for i, t in enumerate(self.decoders)
+                 if stats.get(t, {}).get("attempts", 0) >= PAYOFF_MIN_ATTEMPTS]
+        ranked = sorted((self.decoders[i] for i in known),
+                        key=lambda t: -stats[t]["hit_rate"] / max(stats[t]["mean_ms"], 0.01))
+        tiers = list(self.decoders)
+        for i, tier in zip(known, ranked):
+            tiers[i] = tier
+        return tuple(tiers)
+
+    def decode_cascade(self, image, group, roi, deadline=None, warped=None):
+        """
+        Каскад декодеров от дешевых к QReader (порядок - self.decoders).
+        Каждая ступень учитывается в self.decode_stats.
+        warped - уже выпрямленный QR (иначе выпрямляется здесь).
+        deadline (time.perf_counter) - ступени идут по ожидаемой отдаче, ступень,
+        средняя цена которой (по PAYOFF_MIN_ATTEMPTS и более замерам) больше остатка
+        бюджета, пропускается, но каждый BUDGET_PROBE_EVERY-й пропуск все же
+        выполняется, чтобы ее цена переизмерялась. После дедлайна - выход.
+        """
+        tiers, stats = self.decoders, {}
+        if deadline is not None:
+            stats = self.decode_stats.snapshot()
+            tiers = self._tiers_by_payoff(stats)
+
+        if warped is None and any(t != "qreader_rotated" for t in tiers):
+            with timing.stage("rectify"):
+                warped = self.get_rectified_qr(image, group)
+
+        for tier in tiers:
+            if deadline is not None:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0: break
+                row = stats.get(tier, {})
+                if (row.get("attempts", 0) >= PAYOFF_MIN_ATTEMPTS and row.get("mean_ms", 0.0) > remaining * 1000
+                        and self.decode_stats.record_skip(tier) % BUDGET_PROBE_EVERY):
+                    continue
+
+            if tier == "qreader_rotated":
+                if roi is None: continue
+            elif warped is None:
+                continue
+
+            if tier in ("qreader", "qreader_rotated"):
+                # Разовая ленивая загрузка QReader не входит в цену ступени
+                with self._qreader_lock:
+                    self._get_qreader()
+            t_start = time.perf_counter()
+            if tier == "cv2":
+                text = self._cv_decoder.decode(warped)
+            elif tier == "cv2_bin":
+                text = self._cv_decoder.decode(binarize(warped))
+            elif tier == "qreader":
+                text = self._qreader_decode(warped)
+            elif tier == "qreader_rotated":
+                text = self.try_decode_rotated(roi, deadline)
+            else:
+                raise ValueError(f"Unknown decoder tier: {tier}")
+            elapsed = time.perf_counter() - t_start
+            self.decode_stats.record(tier, text, elapsed)
+            timing.record(f"decode.{tier}", elapsed)
+
+            if text: return text
         return None
 
-    def detect_and_decode(self, image_bgr):
+    def rotated_attempt(self, img, angle, prep):
         """
-        Основной метод.
-        Вход: изображение (BGR).
-        Выход: список данных, отрисованное изображение, время выполнения.
+        Одна попытка QReader: img уже повернут на angle,
+        prep - предобработка (см. core.decoders.preprocess)
         """
-        t_start = time.time()
-        qr_data_list = []
-        output_img = image_bgr.copy()
+        with timing.stage(f"rotated.{angle}.{prep}"):
+            decoded = self._qreader_detect_and_decode(preprocess(img, prep))
+        if decoded and decoded[0]: return decoded[0]
+        return None
 
-        # 1. Запуск YOLO
-        results = self.model(image_bgr, conf=0.25, verbose=False)
-        boxes_list = []
-        conf_list = []
+    def try_decode_rotated(self, roi, deadline=None):
+        """
+        Пытается декодировать ROI, перебирая повороты и предобработку в порядке
+        накопленной успешности (не больше rotated_max_attempts попыток).
+        После deadline (time.perf_counter) новые попытки не начинаются.
+        """
+        if roi is None: return None
 
-        if results and results[0].boxes:
-            for box in results[0].boxes:
-                boxes_list.append(box.xyxy[0].cpu().numpy().astype(int))
-                conf_list.append(float(box.conf[0].cpu().numpy()))
+        # Каждая попытка - своя стадия (rotated.<угол>.<предобработка>),
+        # повернутый ROI считается один раз на угол
+        rotated = {}
+        steps = self.strategy_stats.order(ROTATED_STEPS)[:self.rotated_max_attempts]
+        for attempt, (angle, prep) in enumerate(steps, 1):
+            if deadline is not None and time.perf_counter() >= deadline: break
+            if angle not in rotated:
+                rotated[angle] = roi if angle == 0 else cv2.rotate(roi, ROTATE_CODES[angle])
+            text = self.rotated_attempt(rotated[angle], angle, prep)
+            self.strategy_stats.record((angle, prep), text)
+            if text:
+                self.strategy_stats.record_decoded(attempt)
+                return text
 
-        # 2. Группировка квадратов в треугольники
-        groups = self.group_finder_patterns(boxes_list, conf_list)
+        return None
+
+    def _needs_tiling(self, image):
+        return self.tile_size > 0 and max(image.shape[:2]) >= max(self.tile_min_side, self.tile_size)
 
-        # 3. Декодирование и отрисовка
-        for i, group in enumerate(groups):
-            pts = np.array(group['points'], np.int32)
+    def _coarse_input(self, image):
+        """Уменьшенная копия кадра для грубого прохода YOLO и коэффициенты обратного масштаба"""
+        h, w = image.shape[:2]
+        if self.coarse_side <= 0 or max(h, w) <= self.coarse_side: return image, None
+
+        r = self.coarse_side / max(h, w)
+        small = cv2.resize(image, (max(1, round(w * r)), max(1, round(h * r))), interpolation=cv2.INTER_AREA)
+        return small, (w / small.shape[1], h / small.shape[0])
+
+    @staticmethod
+    def _scale_boxes(prediction, scale, shape):
+        """Боксы грубого прохода -> координаты полного кадра"""
+        boxes_list, conf_list = prediction
+        if scale is None or not boxes_list: return prediction
+
+        sx, sy = scale
+        h, w = shape[:2]
+        factor = np.array([sx, sy, sx, sy])
+        limit = np.array([w, h, w, h])
+        boxes_list = [np.clip(np.round(b * factor), 0, limit).astype(int) for b in boxes_list]
+        return boxes_list, conf_list
+
+    def _predict_boxes(self, images):
+        """
+        YOLO для списка кадров: обычные - одним вызовом бэкенда (при coarse_side - на
+        уменьшенной копии), очень большие - по тайлам.
+        """
+        outputs = [None] * len(images)
+        plain = [i for i, img in enumerate(images) if not self._needs_tiling(img)]
+        if plain:
+            inputs = [self._coarse_input(images[i]) for i in plain]
+            predictions = self.backend.predict([small for small, _ in inputs])
+            for i, (_, scale), prediction in zip(plain, inputs, predictions):
+                outputs[i] = self._scale_boxes(prediction, scale, images[i].shape)
+
+        for i, img in enumerate(images):
+            if outputs[i] is None:
+                outputs[i] = predict_tiled(self.backend, img, self.tile_size, self.tile_overlap, self.tile_batch)
+        return outputs
+
+    def _decode_group(self, image_bgr, group, deadline=None):
+        # Попытка декодировать контент: кэш по углам кода и хэшу выпрямленной области,
+        # затем каскад декодеров (OpenCV на выпрямленном QR -> бинаризация -> QReader -> перебор поворотов).
+        # Группа, до которой бюджет не дошел, остается "найденной, но не декодированной"
+        # и в кэш не попадает - следующий кадр попробует снова
+        if deadline is not None and time.perf_counter() >= deadline: return None
+        with timing.stage("crop"):
+            roi = self.get_qr_crop(image_bgr, group)
+        warped = cache_key = text = None
+        if self.decode_cache.max_size > 0:
+            with timing.stage("rectify"):
+                warped = self.get_rectified_qr(image_bgr, group)
+            with timing.stage("cache"):
+                if warped is not None:
+                    cache_key = self.decode_cache.make_key(self.get_code_area(warped), finder_quad(group))
+                text = self.decode_cache.get(cache_key)
+        if not text:
+            text = self.decode_cascade(image_bgr, group, roi, deadline, warped)
+            self.decode_cache.put(cache_key, text)
+        return text or None
+
+    def _decode_groups(self, image_bgr, boxes_list, conf_list, times, deadline=None):
+        """
+        Группировка и декодирование по уже найденным боксам, без рисования.
+        Возвращает DetectionBatch со всеми группами (декодированными и нет),
+        разбивка по стадиям копится в times (timing.StageTimes).
+        """
+        with timing.collect(times):
+            # 2. Группировка квадратов в треугольники
+            with timing.stage("grouping"):
+                groups = self.group_finder_patterns(boxes_list, conf_list)
+
+            # 3. Декодирование (map сохраняет порядок групп при параллельном режиме).
+            # Потоки пула пишут стадии в ту же разбивку: при параллельном декодировании
+            # сумма стадий может превышать общее время кадра
+            if self._decode_pool is not None and len(groups) > 1:
+                def decode_in_pool(group):
+                    with timing.collect(times):
+                        return self._decode_group(image_bgr, group, deadline)
+                texts = list(self._decode_pool.map(decode_in_pool, groups))
+            else:
+                texts = [self._decode_group(image_bgr, g, deadline) for g in groups]
+
+        return DetectionBatch.from_groups(groups, texts)
+
+    def render(self, image_bgr, results):
+        """
+        Отрисовка результатов detect() (DetectionBatch) на копии изображения.
+        Вызывается только тогда, когда нужна картинка для превью.
+        """
+        output_img = image_bgr.copy()
 
-            # Попытка декодировать контент
-            text = self.try_decode_rotated(self.get_qr_crop(image_bgr, group))
+        for i, text in enumerate(results.texts):
+            pts = results.points[i]
 
             # Цвет: Зеленый если декодирован, Оранжевый если просто геометрически найден
             color = (100, 255, 0) if text else (0, 165, 255)
@@ -209,21 +403,99 @@ class QRDetector:
             cv2.polylines(output_img, [pts], True, color, 3, cv2.LINE_AA)
 
             if text:
-                qr_data_list.append({
-                    'text': text,
-                    'conf': group['yolo_conf'],
-                    'geo_score': group['score'],
-                    # ВАЖНО: сохраняем координаты для перерисовки в галерее
-                    'points': group['points'],
-                    'corner': group['corner']
-                })
-
-                corner = group['corner']
-                label = f"ID:{i} | C:{group['yolo_conf']:.2f}"
+                corner = results.corners[i]
+                label = f"ID:{i} | C:{results.conf[i]:.2f}"
                 # Рисуем подпись
                 cv2.putText(output_img, label, (int(corner[0]), int(corner[1]) - 10),
                             cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1, cv2.LINE_AA)
 
-        t_end = time.time()
+        return output_img
+
+    def detect(self, image_bgr, budget=None):
+        """
+        Структурированная детекция без копирования кадра и рисования.
+        Вход: изображение (BGR); budget - бюджет декодирования в секундах (None - без
+        ограничения), отсчитывается после YOLO: по его исчерпании декодирование
+        прекращается, оставшиеся группы попадают в .located.
+        Выход: DetectionBatch - ведет себя как список декодированных QR,
+        .located - найденные, но не декодированные группы, .duration - время,
+        .timings - разбивка по стадиям (сек).
+        """
+        t_start = time.perf_counter()
+        times = timing.StageTimes()
+
+        # 1. Запуск YOLO
+        with timing.collect(times), timing.stage("inference"):
+            boxes_list, conf_list = self._predict_boxes([image_bgr])[0]
+        # Бюджет - только на декодирование: время инференса (на CPU сравнимо с бюджетом) в него не входит
+        deadline = time.perf_counter() + budget if budget is not None else None
+
+        batch = self._decode_groups(image_bgr, boxes_list, conf_list, times, deadline)
+
+        batch.duration = time.perf_counter() - t_start
+        timing.record("total", batch.duration)
+        batch.timings = times.as_dict()
+        return batch
+
+    def detect_and_decode(self, image_bgr, budget=None):
+        """
+        Основной метод.
+        Вход: изображение (BGR), budget - бюджет декодирования в секундах (см. detect).
+        Выход: список данных, отрисованное изображение, время выполнения.
+        """
+        t_start = time.perf_counter()
+        results = self.detect(image_bgr, budget)
+        with timing.stage("render"):
+            output_img = self.render(image_bgr, results)
+
+        t_end = time.perf_counter()
         # Возвращаем: Данные, Картинку с рисунками, Время
-        return qr_data_list, output_img, (t_end - t_start)
\ No newline at end of file
+        return results.codes, output_img, (t_end - t_start)
+
+    def detect_batch(self, images, batch_size=8):
+        """
+        Пакетная версия detect.
+        Вход: список изображений (BGR). YOLO запускается пачками до batch_size кадров,
+        группировка и декодирование идут по каждому изображению отдельно.
+        Выход: список DetectionBatch в порядке входных изображений.
+        Время кадра = его доля времени пакетного YOLO + собственная постобработка.
+        """
+        outputs = [None] * len(images)
+
+        # В пачку попадают только кадры одного размера: тогда letterbox
+        # такой же, как при одиночном вызове, и боксы совпадают
+        by_shape = {}
+        for idx, img in enumerate(images):
+            by_shape.setdefault(img.shape, []).append(idx)
+
+        for indices in by_shape.values():
+            for s in range(0, len(indices), batch_size):
+                chunk = indices[s:s + batch_size]
+
+                t_start = time.perf_counter()
+                predictions = self._predict_boxes([images[idx] for idx in chunk])
+                t_share = (time.perf_counter() - t_start) / len(chunk)
+
+                for idx, (boxes_list, conf_list) in zip(chunk, predictions):
+                    t_post = time.perf_counter()
+                    times = timing.StageTimes()
+                    times.add("inference", t_share)
+                    timing.STAGE_STATS.record("inference", t_share)
+
+                    batch = self._decode_groups(images[idx], boxes_list, conf_list, times)
+                    batch.duration = t_share + (time.perf_counter() - t_post)
+                    timing.record("total", batch.duration)
+                    batch.timings = times.as_dict()
+                    outputs[idx] = batch
+
+        return outputs
+
+    def detect_and_decode_batch(self, images, batch_size=8):
+        """
+        Пакетная версия detect_and_decode.
+        Выход: список кортежей (данные, картинка, время) в порядке входных изображений.
+        """
+        outputs = []
+        for img, results in zip(images, self.detect_batch(images, batch_size)):
+            outputs.append((results.codes, self.render(img, results), results.duration))
+        return outputs
@@ -0,0 +1,99 @@
+# core/detector_pool.py
+import sys
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class DetectorPool:
+    """
+    Пул реплик QRDetector для одновременных источников (GUI, IP-камера, монитор экрана).
+
+    Ни модель ultralytics, ни QReader не заявлены как реентерабельные, поэтому каждая
+    реплика в каждый момент обслуживает один вызов. Вызовы идут через submit -> Future;
+    replicas=1 - один последовательный исполнитель. Кэш декодирования и статистика
+    (каскад, стратегии поворотов) общие для всех реплик.
+
+    Методы detect / detect_and_decode / detect_batch повторяют QRDetector (блокируют
+    до результата), поэтому пул подставляется вместо детектора без изменений в вызывающем коде.
+    """
+
+    def __init__(self, factory, replicas=1, torch_threads=0):
+        """
+        factory() -> QRDetector; torch_threads - число intra-op потоков torch
+        на реплику (0 - по умолчанию torch), задается в каждом рабочем потоке пула.
+        """
+        self.replicas = [factory() for _ in range(max(1, replicas))]
+        self.torch_threads = torch_threads
+
+        primary = self.replicas[0]
+        for replica in self.replicas[1:]:
+            replica.decode_cache = primary.decode_cache
+            replica.decode_stats = primary.decode_stats
+            replica.strategy_stats = primary.strategy_stats
+
+        self._free = queue.Queue()
+        for replica in self.replicas:
+            self._free.put(replica)
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=len(self.replicas), thread_name_prefix="qr-pool")
+
+    # --- Общее состояние реплик ---
+    @property
+    def backend(self):
+        return self.replicas[0].backend
+
+    @property
+    def decode_cache(self):
+        return self.replicas[0].decode_cache
+
+    @property
+    def decode_stats(self):
+        return self.replicas[0].decode_stats
+
+    @property
+    def strategy_stats(self):
+        return self.replicas[0].strategy_stats
+
+    def _set_torch_threads(self):
+        # torch.set_num_threads действует на вызывающий поток; torch не импортируем
+        # сами - он нужен только бэкенду ultralytics и QReader
+        if self.torch_threads <= 0 or getattr(self._local, "torch_threads_set", False): return
+        torch = sys.modules.get("torch")
+        if torch is None: return
+        torch.set_num_threads(self.torch_threads)
+        self._local.torch_threads_set = True
+
+    def _call(self, method, args, kwargs):
+        self._set_torch_threads()
+        replica = self._free.get()
+        try:
+            return getattr(replica, method)(*args, **kwargs)
+        finally:
+            self._free.put(replica)
+
+    def submit(self, method, *args, **kwargs):
+        """Вызов метода QRDetector на свободной реплике -> concurrent.futures.Future"""
+        return self._executor.submit(self._call, method, args, kwargs)
+
+    # --- Интерфейс QRDetector ---
+    def detect(self, image_bgr, budget=None):
+        return self.submit("detect", image_bgr, budget=budget).result()
+
+    def detect_and_decode(self, image_bgr, budget=None):
+        return self.submit("detect_and_decode", image_bgr, budget=budget).result()
+
+    def detect_batch(self, images, batch_size=8):
+        return self.submit("detect_batch", images, batch_size).result()
+
+    def detect_and_decode_batch(self, images, batch_size=8):
+        return self.submit("detect_and_decode_batch", images, batch_size).result()
+
+    def render(self, image_bgr, results):
+        # Только рисование, модель не нужна
+        return self.replicas[0].render(image_bgr, results)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        for replica in self.replicas:
+            replica.close()
@@ -0,0 +1,24 @@
+# core/factory.py
+import config
+
+
+def create_detector(replicas=None, strategy_path=config.DECODE_STRATEGY_PATH):
+    """
+    Пул реплик детектора с параметрами из config.py.
+    Используется окном приложения (в фоновом потоке) и HTTP-сервером.
+    strategy_path=None - статистика стратегий поворота не загружается и не сохраняется.
+    """
+    # Импорт здесь: core.detector тянет тяжелые зависимости бэкендов
+    from core.detector import QRDetector
+    from core.detector_pool import DetectorPool
+
+    def replica():
+        return QRDetector(config.MODEL_PATH, backend=config.INFERENCE_BACKEND, threads=config.INFERENCE_THREADS,
+                          profile=config.MODEL_PROFILE, tile_size=config.TILE_SIZE,
+                          tile_overlap=config.TILE_OVERLAP, tile_min_side=config.TILE_MIN_SIDE,
+                          coarse_side=config.COARSE_SIDE, cache_size=config.DECODE_CACHE_SIZE,
+                          decoders=config.DECODER_CASCADE,
+                          decode_workers=config.DECODE_WORKERS, strategy_path=strategy_path,
+                          rotated_max_attempts=config.ROTATED_MAX_ATTEMPTS)
+    if replicas is None: replicas = config.DETECTOR_REPLICAS
+    return DetectorPool(replica, replicas=replicas, torch_threads=config.INFERENCE_THREADS)
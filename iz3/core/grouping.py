@@ -0,0 +1,396 @@
+# core/grouping.py
+import numpy as np
+from math import hypot
+from itertools import combinations
+
+# Пороги геометрической проверки тройки finder patterns
+MAX_BOX_ASPECT = 1.8   # Бокс паттерна должен быть почти квадратным
+MAX_SIZE_RATIO = 1.5   # Разброс размеров паттернов внутри одного QR
+MAX_REL_DIST = 15.0    # Гипотенуза относительно среднего размера паттерна
+MAX_LEG_RATIO = 2.5    # Катеты должны быть примерно равны
+MAX_COS_ANGLE = 0.5    # Угол при вершине должен быть около 90 градусов
+
+# Сколько троек оценивается за один векторный проход (ограничение памяти)
+TRIPLES_CHUNK = 1 << 20
+
+# Начиная с этого числа боксов тройки строятся только из соседей по сетке
+PRUNE_MIN_BOXES = 24
+# Любая пара валидной тройки: dist <= MAX_REL_DIST * avg <= MAX_REL_DIST * MAX_SIZE_RATIO * min(w).
+# Небольшой запас компенсирует ошибки округления - точная проверка все равно в score_triangles
+PAIR_RADIUS_FACTOR = MAX_REL_DIST * MAX_SIZE_RATIO * 1.001
+
+
+def triangle_score_py(boxes_indices, all_boxes):
+    """
+    Эталонная (чисто питоновская) проверка одной тройки боксов.
+    Возвращает (score, corner, points) или (inf, None, None).
+    """
+    idx1, idx2, idx3 = boxes_indices
+    b1, b2, b3 = all_boxes[idx1], all_boxes[idx2], all_boxes[idx3]
+
+    # 1. Проверка соотношения сторон самих боксов (они должны быть квадратными)
+    for b in [b1, b2, b3]:
+        w_box = b[2] - b[0]
+        h_box = b[3] - b[1]
+        if min(w_box, h_box) == 0: return float('inf'), None, None
+        aspect = max(w_box, h_box) / min(w_box, h_box)
+        if aspect > MAX_BOX_ASPECT: return float('inf'), None, None
+
+    # 2. Проверка размеров (боксы должны быть примерно одинаковыми)
+    w1, w2, w3 = b1[2] - b1[0], b2[2] - b2[0], b3[2] - b3[0]
+    sizes = [w1, w2, w3]
+    avg_size = sum(sizes) / 3
+    max_size = max(sizes)
+    min_size = min(sizes)
+
+    if max_size > min_size * MAX_SIZE_RATIO: return float('inf'), None, None
+
+    # Центры боксов
+    p1 = ((b1[0] + b1[2]) // 2, (b1[1] + b1[3]) // 2)
+    p2 = ((b2[0] + b2[2]) // 2, (b2[1] + b2[3]) // 2)
+    p3 = ((b3[0] + b3[2]) // 2, (b3[1] + b3[3]) // 2)
+    points = [p1, p2, p3]
+
+    # Расстояния между центрами
+    dists = []
+    dists.append((hypot(p1[0] - p2[0], p1[1] - p2[1]), 0, 1, 2))
+    dists.append((hypot(p1[0] - p3[0], p1[1] - p3[1]), 0, 2, 1))
+    dists.append((hypot(p2[0] - p3[0], p2[1] - p3[1]), 1, 2, 0))
+    dists.sort(key=lambda x: x[0])
+
+    short1, _, _, _ = dists[0]
+    short2, _, _, _ = dists[1]
+    long_side, _, _, corner_idx = dists[2]
+
+    if short1 == 0: return float('inf'), None, None
+
+    # 3. Проверка дистанции относительно размера паттерна
+    rel_dist = long_side / avg_size
+    if rel_dist > MAX_REL_DIST: return float('inf'), None, None
+
+    # Длинная сторона должна быть гипотенузой
+    if long_side < short1 or long_side < short2: return float('inf'), None, None
+
+    # Катеты должны быть примерно равны
+    ratio_legs = max(short1, short2) / min(short1, short2)
+    if ratio_legs > MAX_LEG_RATIO: return float('inf'), None, None
+
+    # 4. Проверка угла (должен быть 90 градусов, теорема косинусов)
+    cos_angle = (short1 ** 2 + short2 ** 2 - long_side ** 2) / (2 * short1 * short2)
+    angle_err = abs(cos_angle)
+    if angle_err > MAX_COS_ANGLE: return float('inf'), None, None
+
+    # Рассчет итоговой оценки (чем меньше, тем лучше)
+    size_diff = (max_size - min_size) / min_size
+    score = (size_diff * 3.0) + (angle_err * 2.0) + (rel_dist * 0.05)
+
+    return score, points[corner_idx], [p1, p2, p3]
+
+
+def group_finder_patterns_py(boxes, confidences):
+    """
+    Эталонная группировка: полный перебор троек через triangle_score_py.
+    Используется бенчмарком для сравнения с векторной версией.
+    """
+    n = len(boxes)
+    if n < 3: return []
+    possible_groups = []
+
+    for indices in combinations(range(n), 3):
+        score, corner, pts = triangle_score_py(indices, boxes)
+        if score != float('inf'):
+            avg_yolo_conf = (confidences[indices[0]] + confidences[indices[1]] + confidences[indices[2]]) / 3
+
+            max_span = max(hypot(pts[0][0] - pts[1][0], pts[0][1] - pts[1][1]),
+                           hypot(pts[1][0] - pts[2][0], pts[1][1] - pts[2][1]),
+                           hypot(pts[0][0] - pts[2][0], pts[0][1] - pts[2][1]))
+
+            possible_groups.append({
+                'score': score,
+                'yolo_conf': avg_yolo_conf,
+                'indices': set(indices),
+                'points': pts,
+                'corner': corner,
+                'span': max_span
+            })
+
+    possible_groups.sort(key=lambda x: x['score'])
+    return select_non_overlapping(possible_groups)
+
+
+def select_non_overlapping(sorted_groups):
+    """Жадно берет лучшие группы, пока они не делят между собой паттерны"""
+    final_groups = []
+    used_indices = set()
+    for g in sorted_groups:
+        if not g['indices'].intersection(used_indices):
+            final_groups.append(g)
+            used_indices.update(g['indices'])
+    return final_groups
+
+
+def _triple_chunks(n, chunk_size=TRIPLES_CHUNK):
+    """
+    Генерирует все тройки i < j < k в лексикографическом порядке
+    (как itertools.combinations), порциями не больше chunk_size.
+    """
+    jj, kk = np.triu_indices(n, 1)
+    # row_start[j] - смещение первой пары (j, k) в списке пар
+    row_start = np.concatenate(([0], np.cumsum(np.arange(n - 1, 0, -1))))
+    n_pairs = len(jj)
+
+    i = 0
+    while i < n - 2:
+        firsts, total = [], 0
+        while i < n - 2:
+            count = n_pairs - row_start[i + 1]
+            if firsts and total + count > chunk_size:
+                break
+            firsts.append(i)
+            total += count
+            i += 1
+
+        starts = [row_start[f + 1] for f in firsts]
+        a = np.repeat(np.array(firsts), [n_pairs - s for s in starts])
+        b = np.concatenate([jj[s:] for s in starts])
+        c = np.concatenate([kk[s:] for s in starts])
+        yield a, b, c
+
+
+def _neighbour_pairs(widths, cx, cy):
+    """
+    Пары боксов (u < v), которые вообще могут оказаться в одной тройке:
+    близкие по размеру и лежащие не дальше PAIR_RADIUS_FACTOR * min(w).
+
+    Боксы раскладываются по корзинам размера (степени двойки, frexp точен),
+    и для корзины b соседи ищутся в корзинах b и b + 1 по равномерной сетке
+    с шагом, равным максимальному радиусу корзины b.
+    """
+    bucket = np.frexp(widths.astype(np.float64))[1]
+    us, vs = [], []
+
+    for b in np.unique(bucket).tolist():
+        a_idx = np.flatnonzero(bucket == b)
+        s_idx = np.flatnonzero((bucket == b) | (bucket == b + 1))
+        cell = float(widths[a_idx].max()) * PAIR_RADIUS_FACTOR
+
+        sx = np.floor(cx[s_idx] / cell).astype(np.int64)
+        sy = np.floor(cy[s_idx] / cell).astype(np.int64)
+        x0, y0 = sx.min() - 1, sy.min() - 1
+        rows = sy.max() - y0 + 2
+        s_key = (sx - x0) * rows + (sy - y0)
+        order = np.argsort(s_key, kind='stable')
+        s_key, s_idx = s_key[order], s_idx[order]
+
+        ax = np.floor(cx[a_idx] / cell).astype(np.int64)
+        ay = np.floor(cy[a_idx] / cell).astype(np.int64)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                q_key = (ax + dx - x0) * rows + (ay + dy - y0)
+                lo = np.searchsorted(s_key, q_key, 'left')
+                hi = np.searchsorted(s_key, q_key, 'right')
+                counts = hi - lo
+                total = int(counts.sum())
+                if not total: continue
+                u = np.repeat(a_idx, counts)
+                pos = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+                v = s_idx[np.repeat(lo, counts) + pos]
+                # Внутри корзины каждую пару берем один раз, с соседней - всегда
+                sel = (u < v) | ((bucket[v] != b) & (u != v))
+                us.append(u[sel])
+                vs.append(v[sel])
+
+    if not us: return np.empty(0, np.int64), np.empty(0, np.int64)
+    u, v = np.concatenate(us), np.concatenate(vs)
+    u, v = np.minimum(u, v), np.maximum(u, v)
+
+    wu, wv = widths[u], widths[v]
+    w_min = np.minimum(wu, wv)
+    ok = ~(np.maximum(wu, wv) > w_min * MAX_SIZE_RATIO)
+    ok &= _pair_dist(cx, cy, u, v) <= w_min * PAIR_RADIUS_FACTOR
+    u, v = u[ok], v[ok]
+
+    order = np.lexsort((v, u))
+    return u[order], v[order]
+
+
+def _pruned_triple_chunks(widths, cx, cy, chunk_size=TRIPLES_CHUNK):
+    """
+    Тройки, у которых все три пары - соседи (см. _neighbour_pairs),
+    в лексикографическом порядке, порциями не больше chunk_size.
+    """
+    n = len(widths)
+    u, v = _neighbour_pairs(widths, cx, cy)
+    n_edges = len(u)
+    if not n_edges: return
+
+    # CSR: соседи u, большие u, отсортированы по возрастанию
+    indptr = np.searchsorted(u, np.arange(n + 1))
+    edge_keys = u * n + v
+    # Для ребра (u, v) третья вершина w > v берется из хвоста строки u
+    counts = indptr[u + 1] - np.arange(n_edges) - 1
+    bounds = np.cumsum(counts)
+
+    start = 0
+    while start < n_edges:
+        base = bounds[start - 1] if start else 0
+        end = max(int(np.searchsorted(bounds, base + chunk_size, 'right')), start + 1)
+        cnt = counts[start:end]
+        total = int(cnt.sum())
+        if total:
+            e = np.repeat(np.arange(start, end), cnt)
+            pos = np.arange(total) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+            a, b, c = u[e], v[e], v[e + 1 + pos]
+            # Ребро (v, w) тоже должно существовать
+            k = b * n + c
+            hit = np.searchsorted(edge_keys, k)
+            hit = edge_keys[np.minimum(hit, n_edges - 1)] == k
+            if hit.any():
+                yield a[hit], b[hit], c[hit]
+        start = end
+
+
+def _pair_dist(cx, cy, u, v):
+    # sqrt от точной суммы квадратов совпадает с math.hypot для целых координат
+    dx = (cx[u] - cx[v]).astype(np.float64)
+    dy = (cy[u] - cy[v]).astype(np.float64)
+    return np.sqrt(dx * dx + dy * dy)
+
+
+def score_triangles(widths, cx, cy, a, b, c):
+    """
+    Векторная версия triangle_score_py для массивов индексов a, b, c.
+    Возвращает (idx, score, corner, long_side) только для прошедших проверку троек,
+    где idx - позиции этих троек во входных массивах.
+    """
+    # 2. Размеры боксов примерно одинаковые
+    wa, wb, wc = widths[a], widths[b], widths[c]
+    max_size = np.maximum(np.maximum(wa, wb), wc)
+    min_size = np.minimum(np.minimum(wa, wb), wc)
+    mask = ~(max_size > min_size * MAX_SIZE_RATIO)
+
+    a, b, c = a[mask], b[mask], c[mask]
+    wa, wb, wc = wa[mask], wb[mask], wc[mask]
+    max_size, min_size = max_size[mask], min_size[mask]
+    avg_size = (wa + wb + wc) / 3
+
+    d01 = _pair_dist(cx, cy, a, b)
+    d02 = _pair_dist(cx, cy, a, c)
+    d12 = _pair_dist(cx, cy, b, c)
+
+    long_side = np.maximum(np.maximum(d01, d02), d12)
+    short1 = np.minimum(np.minimum(d01, d02), d12)
+    short2 = np.maximum(np.minimum(d01, d02), np.minimum(np.maximum(d01, d02), d12))
+    # При равных сторонах стабильная сортировка оставляет последней d12, затем d02
+    corner = np.where(d12 == long_side, a, np.where(d02 == long_side, b, c))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ok = short1 != 0
+
+        # 3. Дистанция относительно размера паттерна
+        rel_dist = long_side / avg_size
+        ok &= ~(rel_dist > MAX_REL_DIST)
+
+        # Катеты примерно равны
+        ok &= ~(short2 / short1 > MAX_LEG_RATIO)
+
+        # 4. Угол около 90 градусов
+        cos_angle = (short1 ** 2 + short2 ** 2 - long_side ** 2) / (2 * short1 * short2)
+        angle_err = np.abs(cos_angle)
+        ok &= ~(angle_err > MAX_COS_ANGLE)
+
+        size_diff = (max_size - min_size) / min_size
+        score = (size_diff * 3.0) + (angle_err * 2.0) + (rel_dist * 0.05)
+
+    idx = np.flatnonzero(mask)[ok]
+    return idx, score[ok], corner[ok], long_side[ok]
+
+
+def group_finder_patterns(boxes, confidences, prune=None):
+    """
+    Векторная группировка finder patterns в QR-треугольники.
+    Результат полностью совпадает с group_finder_patterns_py.
+    prune: строить тройки только из пространственных соседей
+    (None - автоматически, начиная с PRUNE_MIN_BOXES боксов).
+    """
+    n = len(boxes)
+    if n < 3: return []
+
+    arr = np.asarray(boxes).reshape(n, 4)
+    conf = np.asarray(confidences, dtype=np.float64)
+
+    w = arr[:, 2] - arr[:, 0]
+    h = arr[:, 3] - arr[:, 1]
+    cx = (arr[:, 0] + arr[:, 2]) // 2
+    cy = (arr[:, 1] + arr[:, 3]) // 2
+
+    # 1. Бокс, не прошедший проверку формы, не может входить ни в одну тройку
+    lo, hi = np.minimum(w, h), np.maximum(w, h)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        box_ok = (lo != 0) & ~(hi / lo > MAX_BOX_ASPECT)
+    keep = np.flatnonzero(box_ok)
+    if len(keep) < 3: return []
+
+    w, cx, cy = w[keep], cx[keep], cy[keep]
+
+    if prune is None:
+        prune = len(keep) >= PRUNE_MIN_BOXES
+    # Отрицательная ширина ломает корзины размеров - такие наборы перебираем целиком
+    if prune and (w > 0).all():
+        triples = _pruned_triple_chunks(w, cx, cy)
+    else:
+        triples = _triple_chunks(len(keep))
+
+    parts = []
+    for a, b, c in triples:
+        idx, score, corner, span = score_triangles(w, cx, cy, a, b, c)
+        if len(idx):
+            parts.append((a[idx], b[idx], c[idx], score, corner, span))
+    if not parts: return []
+
+    a, b, c, score, corner, span = (np.concatenate(p) for p in zip(*parts))
+    # Стабильная сортировка сохраняет порядок combinations при равных оценках
+    order = np.argsort(score, kind='stable')
+
+    pts_x, pts_y = cx.tolist(), cy.tolist()
+    orig = keep.tolist()
+    a, b, c, corner = a[order].tolist(), b[order].tolist(), c[order].tolist(), corner[order].tolist()
+    score, span = score[order].tolist(), span[order].tolist()
+
+    # Жадный отбор как в select_non_overlapping, но словари собираются только для принятых групп
+    final_groups = []
+    used = [False] * len(orig)
+    for t in range(len(a)):
+        ia, ib, ic = a[t], b[t], c[t]
+        if used[ia] or used[ib] or used[ic]: continue
+        used[ia] = used[ib] = used[ic] = True
+        ik = corner[t]
+        final_groups.append({
+            'score': score[t],
+            'yolo_conf': float((conf[orig[ia]] + conf[orig[ib]] + conf[orig[ic]]) / 3),
+            'indices': {orig[ia], orig[ib], orig[ic]},
+            'points': [(pts_x[ia], pts_y[ia]), (pts_x[ib], pts_y[ib]), (pts_x[ic], pts_y[ic])],
+            'corner': (pts_x[ik], pts_y[ik]),
+            'span': span[t]
+        })
+    return final_groups
+
+
+def finder_quad(group):
+    """
+    Четыре угла QR по центрам finder patterns группы в порядке
+    (верх-лево, верх-право, низ-право, низ-лево) для прямо стоящего кода.
+    Угловой паттерн - верх-лево, четвертый угол достраивается до параллелограмма.
+    """
+    corner = np.array(group['corner'], dtype=np.float32)
+    others = [np.array(p, dtype=np.float32) for p in group['points'] if tuple(p) != tuple(group['corner'])]
+    if len(others) != 2: return None
+    a, b = others
+
+    # В координатах изображения (ось y вниз) у прямого QR векторное
+    # произведение (верх-право - угол) x (низ-лево - угол) положительно
+    va, vb = a - corner, b - corner
+    if va[0] * vb[1] - va[1] * vb[0] < 0:
+        a, b = b, a
+
+    return np.array([corner, a, a + b - corner, b], dtype=np.float32)
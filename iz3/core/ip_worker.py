@@ -1,21 +1,86 @@
 # core/ip_worker.py
 import cv2
 import time
+import threading
+from collections import deque
 import numpy as np
 from PyQt6.QtCore import QThread, pyqtSignal
 
+from core import timing
+
+
+class LatestFrameReader(threading.Thread):
+    """
+    Поток чтения камеры: держит только самый свежий кадр.
+    Пока детекция занята, поток продолжает вычитывать сеть, поэтому кадры не копятся
+    в буфере бэкенда (CAP_PROP_BUFFERSIZE многие бэкенды игнорируют).
+    Кадр, замененный новым до того, как его взяли, считается отброшенным.
+    """
+
+    def __init__(self, cap, on_frame=None):
+        super().__init__(name="qr-camera-reader", daemon=True)
+        self.cap = cap
+        self.on_frame = on_frame  # вызывается для каждого кадра (превью)
+        self._cond = threading.Condition()
+        self._frame = None
+        self._stamp = 0.0
+        self._seq = 0
+        self._taken = 0
+        self._run = True
+        self.captured = 0
+        self.dropped = 0
+
+    def run(self):
+        while self._run:
+            ret, frame = self.cap.read()
+            if not ret:
+                # Если поток прервался, ждем и пробуем снова
+                time.sleep(0.1)
+                continue
+            # "Стекло" - момент, когда кадр получен из потока: задержку внутри камеры и сети не видно
+            stamp = time.perf_counter()
+
+            with self._cond:
+                if self._taken < self._seq: self.dropped += 1
+                self._seq += 1
+                self.captured += 1
+                self._frame, self._stamp = frame, stamp
+                self._cond.notify_all()
+
+            if self.on_frame is not None and self._run:
+                self.on_frame(frame)
+
+    def latest(self, timeout=0.1):
+        """Самый свежий еще не взятый кадр: (кадр, время получения perf_counter) или None по таймауту"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._taken < self._seq or not self._run, timeout):
+                return None
+            if not self._run: return None
+            self._taken = self._seq
+            return self._frame, self._stamp
+
+    def stop(self):
+        with self._cond:
+            self._run = False
+            self._cond.notify_all()
+        self.join()
+
 
 class IPCameraWorker(QThread):
     frame_ready = pyqtSignal(np.ndarray)  # Просто кадр для превью
     result_ready = pyqtSignal(list, np.ndarray, float)  # Если нашли код: данные, картинка, время
     error_occurred = pyqtSignal(str)
 
-    def __init__(self, url, detector):
+    def __init__(self, url, detector, budget=None):
         super().__init__()
         self.url = url
         self.detector = detector
+        # Бюджет декодирования на кадр, сек (None - без ограничения): трудный кадр
+        # не задерживает поток, недекодированные группы пробуются на следующем
+        self.budget = budget
         self._run = True
-        self.skip_frames = 10  # Проверять QR код каждые 10 кадров (оптимизация)
+        self.reader = None
+        self.processed = 0
 
     def run(self):
         cap = cv2.VideoCapture(self.url)
@@ -27,45 +92,108 @@ class IPCameraWorker(QThread):
             self.error_occurred.emit(f"Не удалось подключиться к: {self.url}")
             return
 
-        frame_count = 0
+        # Чтение и превью - в отдельном потоке, детекция берет самый свежий кадр, как только освободится
+        self.reader = LatestFrameReader(cap, on_frame=self.frame_ready.emit)
+        self.reader.start()
 
-        while self._run:
-            ret, frame = cap.read()
-            if not ret:
-                # Если поток прервался, пробуем переподключиться или выходим
-                time.sleep(0.1)
-                continue
-
-            # 1. Отправляем кадр в GUI для плавного видео
-            if self._run:
-                self.frame_ready.emit(frame)
+        try:
+            while self._run:
+                item = self.reader.latest()
+                if item is None: continue
+                frame, stamp = item
 
-            # 2. Раз в N кадров пытаемся найти QR код
-            frame_count += 1
-            if frame_count % self.skip_frames == 0:
                 try:
-                    # Используем "легкую" проверку или полную.
-                    # Чтобы не тормозить поток, можно делать resize для детекции
-                    # Но пока попробуем на полном кадре.
-
-                    # ВАЖНО: detect_and_decode возвращает (qr_data, drawn_img, time)
-                    # Мы используем копию кадра, чтобы рисование не портило превью
-                    check_frame = frame.copy()
-                    qr_data, drawn_img, duration = self.detector.detect_and_decode(check_frame)
+                    timing.record("live.frame_age", time.perf_counter() - stamp)
+                    # detect() не копирует и не рисует на кадре, поэтому превью не портится;
+                    # картинка с разметкой строится только если код найден
+                    results = self.detector.detect(frame, budget=self.budget)
+                    self.processed += 1
+                    timing.record("live.glass_to_result", time.perf_counter() - stamp)
+                    qr_data, duration = results.codes, results.duration
 
                     if qr_data:
                         # УРА! НАШЛИ!
+                        drawn_img = self.detector.render(frame, results)
                         self.result_ready.emit(qr_data, drawn_img, duration)
                         self._run = False  # Останавливаем цикл
                         break
                 except Exception as e:
                     print(f"Detection error in stream: {e}")
+        finally:
+            self.reader.stop()
+            cap.release()
+            stats = self.stats()
+            print(f"[SYSTEM] IP camera: captured={stats['captured']} processed={stats['processed']} "
+                  f"dropped={stats['dropped']}")
+
+    def stats(self):
+        """Счетчики кадров и задержки живого режима (p50/p95/p99 по стадиям live.*)"""
+        reader = self.reader
+        return {
+            "captured": reader.captured if reader else 0,
+            "processed": self.processed,
+            "dropped": reader.dropped if reader else 0,
+            "latency": {stage: v for stage, v in timing.stage_percentiles().items() if stage.startswith("live.")},
+        }
+
+    def stop(self):
+        self._run = False
+        self.wait()
+
+
+class MultiprocCameraWorker(QThread):
+    """
+    Тот же интерфейс, что у IPCameraWorker, но захват и детекция идут в отдельных
+    процессах (core.multiproc): этот поток только забирает кадры для превью
+    и результаты, а разметку рисует на кадре, по которому код найден.
+    """
+    frame_ready = pyqtSignal(np.ndarray)
+    result_ready = pyqtSignal(list, np.ndarray, float)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, url, detector, detectors=2, frame_bytes=3840 * 2160 * 3, budget=None):
+        super().__init__()
+        self.url = url
+        self.detector = detector  # только для render()
+        self.detectors = detectors
+        self.frame_bytes = frame_bytes
+        self.budget = budget
+        self._run = True
+
+    def run(self):
+        # Импорт здесь: режим включается настройкой, обычному потоку модуль не нужен
+        from core.multiproc import MultiprocDetection
+
+        detection = MultiprocDetection(self.url, detectors=self.detectors,
+                                       frame_bytes=self.frame_bytes, budget=self.budget)
+        detection.start()
+        recent = deque(maxlen=32)  # (seq, кадр) показанных кадров - для разметки результата
+        last_seq = 0
+
+        try:
+            while self._run:
+                item = detection.latest_frame(last_seq)
+                if item is not None:
+                    last_seq, _, frame = item
+                    recent.append((last_seq, frame))
+                    self.frame_ready.emit(frame)
 
-            # Ограничение FPS, чтобы не грузить CPU
-            time.sleep(0.01)
+                for kind, payload in detection.poll():
+                    if kind == "error":
+                        self.error_occurred.emit(payload)
+                        self._run = False
+                    elif kind == "result" and self._run:
+                        seq, _, results = payload
+                        if not results.codes or not recent: continue
+                        frame = next((f for s, f in recent if s == seq), recent[-1][1])
+                        drawn_img = self.detector.render(frame, results)
+                        self.result_ready.emit(results.codes, drawn_img, results.duration)
+                        self._run = False
 
-        cap.release()
+                time.sleep(0.01)
+        finally:
+            detection.close()
 
     def stop(self):
         self._run = False
-        self.wait()
\ No newline at end of file
+        self.wait()
@@ -0,0 +1,121 @@
+# core/micro_batcher.py
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from core.timing import StageHistograms
+
+
+class QueueFull(Exception):
+    """Очередь запросов заполнена - вызывающему стоит повторить позже"""
+
+
+class MicroBatcher:
+    """
+    Микро-пакетирование запросов из разных потоков: кадры, пришедшие в пределах
+    window секунд, уходят в один detect_batch (до batch_size кадров).
+    submit(image) -> Future[DetectionBatch].
+
+    Рабочих потоков столько же, сколько реплик у детектора (DetectorPool),
+    очередь ограничена max_queue. Ведет скользящие окна задержек:
+    queue_wait (ожидание в очереди), batch (вызов detect_batch), request (снаружи).
+    """
+
+    def __init__(self, detector, batch_size=8, window=0.005, max_queue=64):
+        self.detector = detector
+        self.batch_size = batch_size
+        self.window = window
+        self.metrics = StageHistograms()
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.images = 0
+        self.rejected = 0
+        self._closed = False
+
+        workers = len(getattr(detector, "replicas", [detector]))
+        self._threads = [threading.Thread(target=self._loop, name=f"qr-batcher-{i}", daemon=True)
+                         for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, image_bgr):
+        if self._closed: raise RuntimeError("batcher is closed")
+        future = Future()
+        try:
+            self._queue.put_nowait((image_bgr, future, time.perf_counter()))
+        except queue.Full:
+            with self._lock: self.rejected += 1
+            raise QueueFull(f"queue is full ({self._queue.maxsize})")
+        return future
+
+    def _collect(self):
+        """Первый запрос ждем сколько угодно (до close), следующие - до конца окна"""
+        while True:
+            try:
+                first = self._queue.get(timeout=0.1)
+                break
+            except queue.Empty:
+                # Очередь разобрана, а сигнал остановки в нее не влез - выходим по флагу
+                if self._closed: return None
+        if first is None:
+            self._queue.put(None)  # остановить и остальные потоки
+            return None
+        batch = [first]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0: break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Сигнал остановки - вернем его другим потокам после этой пачки
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            if batch is None: return
+
+            t_start = time.perf_counter()
+            for _, _, t_submit in batch:
+                self.metrics.record("queue_wait", t_start - t_submit)
+            try:
+                results = self.detector.detect_batch([image for image, _, _ in batch], self.batch_size)
+            except Exception as e:
+                for _, future, _ in batch: future.set_exception(e)
+            else:
+                for (_, future, _), result in zip(batch, results): future.set_result(result)
+            self.metrics.record("batch", time.perf_counter() - t_start)
+
+            with self._lock:
+                self.batches += 1
+                self.images += len(batch)
+
+    def stats(self):
+        with self._lock:
+            batches, images, rejected = self.batches, self.images, self.rejected
+        return {
+            "queue_depth": self._queue.qsize(),
+            "batches": batches,
+            "images": images,
+            "rejected": rejected,
+            "mean_batch_size": round(images / batches, 3) if batches else 0.0,
+            "latency": self.metrics.percentiles(),
+        }
+
+    def close(self):
+        """Новые запросы не принимаются, уже поставленные дорабатываются, потоки завершаются"""
+        self._closed = True
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass  # под нагрузкой потоки остановятся по флагу, когда разберут очередь
+        for thread in self._threads:
+            thread.join()
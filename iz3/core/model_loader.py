@@ -0,0 +1,25 @@
+# core/model_loader.py
+import time
+from PyQt6.QtCore import QThread, pyqtSignal
+
+
+class ModelLoaderWorker(QThread):
+    """
+    Загрузка детектора в фоне: тяжелые импорты (torch, ultralytics, qreader)
+    и чтение весов не блокируют GUI-поток.
+    """
+    loaded = pyqtSignal(object, float)  # детектор, время загрузки (сек)
+    failed = pyqtSignal(str)
+
+    def __init__(self, factory):
+        super().__init__()
+        self.factory = factory
+
+    def run(self):
+        t_start = time.perf_counter()
+        try:
+            detector = self.factory()
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.loaded.emit(detector, time.perf_counter() - t_start)
@@ -0,0 +1,153 @@
+# core/multiproc.py
+"""
+Многопроцессный режим живой детекции (config.MULTIPROCESS_DETECTION).
+
+    процесс захвата   -> FrameRing (shared_memory) -> процессы детекции
+    процессы детекции -> очередь (DetectionBatch.to_bytes) -> процесс GUI
+
+Декодирование, группировка и Qt больше не делят один GIL: GUI только рисует превью
+и разметку, детекция занимает остальные ядра. Процессы запускаются через "spawn"
+(не форкаем процесс с Qt); функции процессов не импортируют Qt, а main.py
+импортирует интерфейс только под __main__, поэтому дочерние процессы его не тянут.
+"""
+import time
+import queue
+import multiprocessing as mp
+
+import cv2
+
+from core.results import DetectionBatch
+from core.shm_ring import FrameRing
+
+def capture_process(source, ring_spec, lock, stop, messages):
+    """Пишет кадры потока камеры (URL) в кольцо, пока не выставлен stop"""
+    ring = FrameRing(lock, **ring_spec)
+    try:
+        _capture_stream(source, ring, stop, messages)
+    except Exception as e:
+        messages.put(("error", f"Capture failed: {e}"))
+    finally:
+        ring.close()
+
+
+def _capture_stream(url, ring, stop, messages):
+    cap = cv2.VideoCapture(url)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    if not cap.isOpened():
+        messages.put(("error", f"Не удалось подключиться к: {url}"))
+        return
+    try:
+        while not stop.is_set():
+            ret, frame = cap.read()
+            if not ret:
+                time.sleep(0.1)
+                continue
+            ring.write(frame)
+    finally:
+        cap.release()
+
+
+def detection_process(ring_spec, lock, stop, messages, budget=None):
+    """Берет самый свежий еще не взятый кадр прямо из кольца и публикует компактный результат"""
+    try:
+        # Импорт здесь: модели грузятся только в процессе детекции.
+        # Статистику стратегий не сохраняем: процессы перезаписывали бы один файл
+        from core.factory import create_detector
+
+        detector = create_detector(replicas=1, strategy_path=None)
+    except Exception as e:
+        messages.put(("error", f"Detector failed to load: {e}"))
+        return
+
+    ring = FrameRing(lock, **ring_spec)
+    messages.put(("ready", None))
+    try:
+        while not stop.is_set():
+            item = ring.acquire_latest(claim=True)
+            if item is None:
+                time.sleep(0.002)
+                continue
+
+            slot, seq, stamp, frame = item
+            try:
+                results = detector.detect(frame, budget=budget)
+            except Exception as e:
+                print(f"Detection error in process: {e}")
+                continue
+            finally:
+                ring.release(slot)
+
+            try:
+                messages.put_nowait(("result", (seq, stamp, results.to_bytes())))
+            except queue.Full:
+                pass  # GUI не успевает забирать - результат устарел
+    finally:
+        ring.close()
+        detector.close()
+
+
+class MultiprocDetection:
+    """
+    Процесс захвата + detectors процессов детекции поверх общего FrameRing.
+    latest_frame() - копия свежего кадра для превью, poll() - накопленные сообщения:
+    ("result", (seq, время захвата в нс, DetectionBatch)), ("error", текст), ("ready", None).
+    """
+
+    def __init__(self, source, detectors=2, slots=6, frame_bytes=3840 * 2160 * 3, budget=None):
+        self.source = source
+        self.detectors = detectors
+        # Читателей: детекторы + превью; писателю всегда нужен хотя бы один свободный слот
+        self.slots = max(slots, detectors + 3)
+        self.frame_bytes = frame_bytes
+        self.budget = budget
+        self.ring = None
+        self._processes = []
+
+    def start(self):
+        ctx = mp.get_context("spawn")
+        self._lock = ctx.Lock()
+        self._stop = ctx.Event()
+        self._messages = ctx.Queue(maxsize=64)
+        self.ring = FrameRing(self._lock, slots=self.slots, frame_bytes=self.frame_bytes, create=True)
+        spec = self.ring.spec()
+
+        self._processes = [ctx.Process(target=capture_process, name="qr-capture", daemon=True,
+                                       args=(self.source, spec, self._lock, self._stop, self._messages))]
+        self._processes += [ctx.Process(target=detection_process, name=f"qr-detect-{i}", daemon=True,
+                                        args=(spec, self._lock, self._stop, self._messages, self.budget))
+                            for i in range(self.detectors)]
+        for process in self._processes:
+            process.start()
+        print(f"[SYSTEM] Multiprocess detection: 1 capture + {self.detectors} detector processes, "
+              f"ring {self.slots} x {self.frame_bytes / 2 ** 20:.1f} MB")
+
+    def latest_frame(self, after_seq=0):
+        """(seq, время захвата в нс, кадр) или None, если нового кадра нет"""
+        return self.ring.read_latest_copy(after_seq)
+
+    def poll(self):
+        messages = []
+        while True:
+            try:
+                kind, payload = self._messages.get_nowait()
+            except queue.Empty:
+                return messages
+            if kind == "result":
+                seq, stamp, data = payload
+                payload = (seq, stamp, DetectionBatch.from_bytes(data))
+            messages.append((kind, payload))
+
+    def close(self, timeout=5.0):
+        if self.ring is None: return
+        self._stop.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        # Очередь не закрыта, пока в ней данные - выбираем остатки
+        self.poll()
+        self._messages.close()
+        self.ring.close()
+        self.ring = None
+        self._processes = []
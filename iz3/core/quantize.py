@@ -0,0 +1,94 @@
+# core/quantize.py
+"""
+Статическая INT8-квантизация ONNX-модели finder patterns (onnxruntime).
+Калибровка идет на папке наших изображений с той же предобработкой, что и в OnnxBackend.
+
+Запуск (из папки iz3):
+    python -m core.quantize --model path/to/best.pt --calib path/to/folder
+Проверка точности против FP32: python -m benchmarks.validate_int8
+"""
+import os
+import argparse
+
+import cv2
+import numpy as np
+
+from core.backends import export_onnx, read_metadata, letterbox, make_blob
+
+IMAGE_EXTS = ('.png', '.jpg', '.jpeg', '.bmp', '.webp')
+
+
+def int8_path(model_path):
+    """Путь INT8-профиля рядом с весами: best.pt -> best.int8.onnx"""
+    return os.path.splitext(model_path)[0] + ".int8.onnx"
+
+
+def list_images(folder, limit=None):
+    names = sorted(f for f in os.listdir(folder) if f.lower().endswith(IMAGE_EXTS))
+    return [os.path.join(folder, f) for f in names[:limit]]
+
+
+def read_image(path):
+    img = cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_COLOR)
+    return img
+
+
+def quantize_int8(model_path, calib_folder, limit=200, per_channel=True):
+    """
+    Экспортирует FP32 ONNX (если нужно) и квантизует его в INT8 (формат QDQ),
+    калибруя диапазоны активаций на изображениях из calib_folder.
+    """
+    import onnx
+    from onnxruntime.quantization import (CalibrationDataReader, CalibrationMethod, QuantFormat,
+                                          QuantType, quantize_static)
+
+    fp32_path = model_path if model_path.endswith(".onnx") else export_onnx(model_path)
+    out_path = int8_path(model_path)
+    imgsz, stride = read_metadata(fp32_path)
+    input_name = onnx.load(fp32_path, load_external_data=False).graph.input[0].name
+    paths = list_images(calib_folder, limit)
+    if not paths:
+        raise FileNotFoundError(f"No calibration images in {calib_folder}")
+
+    class LetterboxReader(CalibrationDataReader):
+        def __init__(self):
+            self._paths = iter(paths)
+
+        def get_next(self):
+            for path in self._paths:
+                img = read_image(path)
+                if img is not None:
+                    return {input_name: make_blob([letterbox(img, imgsz, stride)])}
+            return None
+
+    quantize_static(fp32_path, out_path, LetterboxReader(),
+                    quant_format=QuantFormat.QDQ,
+                    activation_type=QuantType.QUInt8,
+                    weight_type=QuantType.QInt8,
+                    per_channel=per_channel,
+                    calibrate_method=CalibrationMethod.MinMax)
+
+    # Метаданные ultralytics (imgsz, stride, names) нужны OnnxBackend
+    src, dst = onnx.load(fp32_path, load_external_data=False), onnx.load(out_path)
+    existing = {p.key for p in dst.metadata_props}
+    for prop in src.metadata_props:
+        if prop.key not in existing:
+            dst.metadata_props.add(key=prop.key, value=prop.value)
+    onnx.save(dst, out_path)
+
+    print(f"[SYSTEM] INT8 model saved: {out_path} (calibrated on {len(paths)} images)")
+    return out_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Static INT8 quantization of the finder-pattern model")
+    parser.add_argument("--model", required=True, help="best.pt или уже экспортированный best.onnx")
+    parser.add_argument("--calib", required=True, help="папка с изображениями для калибровки")
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--per-tensor", action="store_true", help="квантизация весов по тензору, а не по каналу")
+    args = parser.parse_args()
+    quantize_int8(args.model, args.calib, args.limit, per_channel=not args.per_tensor)
+
+
+if __name__ == "__main__":
+    main()
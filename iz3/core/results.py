@@ -0,0 +1,182 @@
+# core/results.py
+import json
+import struct
+
+import numpy as np
+
+
+class QRResult:
+    """
+    Один QR код - легкое представление строки DetectionBatch.
+    Своих словарей и кортежей не хранит, но читается как прежний dict:
+    code['text'], code.get('conf', 0), 'points' in code.
+    """
+    __slots__ = ('_batch', '_row')
+
+    KEYS = ('id', 'text', 'conf', 'geo_score', 'points', 'corner')
+
+    def __init__(self, batch, row):
+        self._batch = batch
+        self._row = row
+
+    @property
+    def id(self):
+        return self._row
+
+    @property
+    def text(self):
+        return self._batch.texts[self._row]
+
+    @property
+    def conf(self):
+        return float(self._batch.conf[self._row])
+
+    @property
+    def geo_score(self):
+        return float(self._batch.geo_score[self._row])
+
+    @property
+    def points(self):
+        return [tuple(p) for p in self._batch.points[self._row].tolist()]
+
+    @property
+    def corner(self):
+        return tuple(self._batch.corners[self._row].tolist())
+
+    # --- Совместимость со словарем ---
+    def __getitem__(self, key):
+        if key not in self.KEYS: raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self.KEYS and (key != 'text' or self.text is not None)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def keys(self):
+        return [k for k in self.KEYS if k in self]
+
+    def to_dict(self):
+        return {k: self[k] for k in self.keys()}
+
+    def __repr__(self):
+        return f"QRResult({self.to_dict()!r})"
+
+
+class DetectionBatch:
+    """
+    Результат детекции одного изображения: все найденные группы
+    в компактных массивах NumPy (строка = ID группы).
+
+    Ведет себя как список декодированных QRResult (как раньше qr_data_list),
+    не декодированные группы доступны через located.
+    """
+    __slots__ = ('texts', 'conf', 'geo_score', 'points', 'corners', 'duration', 'timings', '_decoded')
+
+    def __init__(self, texts, conf, geo_score, points, corners, duration=0.0, timings=None):
+        n = len(texts)
+        self.texts = list(texts)
+        self.conf = np.asarray(conf, dtype=np.float64).reshape(n)
+        self.geo_score = np.asarray(geo_score, dtype=np.float64).reshape(n)
+        self.points = np.asarray(points, dtype=np.int32).reshape(n, 3, 2)
+        self.corners = np.asarray(corners, dtype=np.int32).reshape(n, 2)
+        self.duration = float(duration)
+        # Разбивка времени по стадиям конвейера, сек (см. core/timing.py)
+        self.timings = dict(timings) if timings else {}
+        self._decoded = [i for i, t in enumerate(self.texts) if t]
+
+    @classmethod
+    def from_groups(cls, groups, texts, duration=0.0):
+        """Собирает результат из групп group_finder_patterns и декодированных текстов"""
+        return cls(texts,
+                   [g['yolo_conf'] for g in groups],
+                   [g['score'] for g in groups],
+                   [g['points'] for g in groups],
+                   [g['corner'] for g in groups],
+                   duration)
+
+    # --- Список декодированных кодов ---
+    def __len__(self):
+        return len(self._decoded)
+
+    def __iter__(self):
+        return (QRResult(self, row) for row in self._decoded)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [QRResult(self, row) for row in self._decoded[index]]
+        return QRResult(self, self._decoded[index])
+
+    @property
+    def codes(self):
+        """Декодированные QR (обычный list - например, для сигналов Qt)"""
+        return list(self)
+
+    @property
+    def located(self):
+        """Группы, найденные геометрически, но не декодированные"""
+        return [QRResult(self, row) for row, t in enumerate(self.texts) if not t]
+
+    @property
+    def group_count(self):
+        return len(self.texts)
+
+    # --- Сериализация ---
+    def to_dict(self):
+        return {
+            'duration': self.duration,
+            'timings': dict(self.timings),
+            'codes': [c.to_dict() for c in self],
+            'located': [c.to_dict() for c in self.located]
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    def to_bytes(self):
+        """
+        Бинарный формат: заголовок (n, duration), массивы conf, geo_score,
+        points, corners и тексты с префиксом длины (-1 = не декодирован).
+        """
+        parts = [struct.pack('<Id', len(self.texts), self.duration),
+                 self.conf.tobytes(), self.geo_score.tobytes(),
+                 self.points.tobytes(), self.corners.tobytes()]
+        for text in self.texts:
+            if text is None:
+                parts.append(struct.pack('<i', -1))
+            else:
+                data = text.encode('utf-8')
+                parts.append(struct.pack('<i', len(data)))
+                parts.append(data)
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        n, duration = struct.unpack_from('<Id', data, 0)
+        offset = struct.calcsize('<Id')
+
+        def take(dtype, count):
+            nonlocal offset
+            arr = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+            offset += arr.nbytes
+            return arr
+
+        conf = take(np.float64, n)
+        geo_score = take(np.float64, n)
+        points = take(np.int32, n * 6)
+        corners = take(np.int32, n * 2)
+
+        texts = []
+        for _ in range(n):
+            (length,) = struct.unpack_from('<i', data, offset)
+            offset += 4
+            if length < 0:
+                texts.append(None)
+            else:
+                texts.append(bytes(data[offset:offset + length]).decode('utf-8'))
+                offset += length
+        return cls(texts, conf, geo_score, points, corners, duration)
+
+    def __repr__(self):
+        return f"DetectionBatch(codes={len(self)}, located={self.group_count - len(self)}, duration={self.duration:.4f})"
@@ -0,0 +1,139 @@
+# core/shm_ring.py
+"""
+Кольцевой буфер кадров в multiprocessing.shared_memory.
+
+Процесс захвата пишет кадры в слоты, процессы детекции берут самый свежий
+непрочитанный кадр без копирования (ndarray прямо на разделяемой памяти).
+Слот, который сейчас читается, писатель не трогает, поэтому при
+slots >= читателей + 2 запись никогда не ждет, а старые кадры просто теряются.
+"""
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Состояния слота
+FREE, WRITING, READY, READING = 0, 1, 2, 3
+# Заголовок слота (int64): состояние, номер кадра, высота, ширина, каналы, время захвата (нс), читателей
+STATE, SEQ, HEIGHT, WIDTH, CHANNELS, STAMP, READERS = range(7)
+HEADER_FIELDS = 7
+# Управляющий блок (int64): последний опубликованный слот, счетчик кадров, последний взятый детекцией кадр
+LATEST, COUNTER, CLAIMED = range(3)
+CONTROL_FIELDS = 3
+
+
+def _attach(name):
+    # Python 3.13+: присоединенный процесс не должен удалять сегмент при выходе
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class FrameRing:
+    """
+    create=True - владелец (создает и в конце удаляет сегмент), иначе - подключение по name.
+    lock - multiprocessing.Lock, общий для всех процессов (защищает только заголовки).
+    """
+
+    def __init__(self, lock, slots=6, frame_bytes=1920 * 1080 * 3, name=None, create=False):
+        self.lock = lock
+        self.slots = slots
+        self.frame_bytes = frame_bytes
+        header_bytes = (CONTROL_FIELDS + slots * HEADER_FIELDS) * 8
+        size = header_bytes + slots * frame_bytes
+
+        if create:
+            self.shm = shared_memory.SharedMemory(create=True, size=size, name=name)
+        else:
+            self.shm = _attach(name)
+        self.owner = create
+
+        buf = self.shm.buf
+        self.control = np.ndarray((CONTROL_FIELDS,), dtype=np.int64, buffer=buf)
+        self.headers = np.ndarray((slots, HEADER_FIELDS), dtype=np.int64, buffer=buf, offset=CONTROL_FIELDS * 8)
+        self.data = np.ndarray((slots, frame_bytes), dtype=np.uint8, buffer=buf, offset=header_bytes)
+        if create:
+            self.control[:] = (-1, 0, 0)
+            self.headers[:] = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def spec(self):
+        """Параметры для подключения из другого процесса: FrameRing(lock, **spec)"""
+        return {"slots": self.slots, "frame_bytes": self.frame_bytes, "name": self.name}
+
+    # --- Писатель ---
+    def write(self, frame):
+        """Копирует кадр в свободный слот и публикует его. Возвращает номер кадра (0 - не записан)"""
+        if frame.nbytes > self.frame_bytes:
+            raise ValueError(f"Frame of {frame.nbytes} bytes does not fit ring slot of {self.frame_bytes}")
+
+        with self.lock:
+            latest = int(self.control[LATEST])
+            slot = next((s for s in ((latest + i) % self.slots for i in range(1, self.slots + 1))
+                         if self.headers[s, STATE] in (FREE, READY)), None)
+            if slot is None: return 0
+            self.headers[slot, STATE] = WRITING
+
+        h, w = frame.shape[:2]
+        c = frame.shape[2] if frame.ndim == 3 else 1
+        self.data[slot, :frame.nbytes] = np.ascontiguousarray(frame).reshape(-1)
+
+        with self.lock:
+            seq = int(self.control[COUNTER]) + 1
+            self.control[COUNTER] = seq
+            self.headers[slot, SEQ:READERS] = (seq, h, w, c, time.time_ns())
+            self.headers[slot, STATE] = READY
+            self.control[LATEST] = slot
+        return seq
+
+    # --- Читатели ---
+    def _view(self, slot):
+        h, w, c = (int(v) for v in self.headers[slot, HEIGHT:STAMP])
+        view = self.data[slot, :h * w * c]
+        return view.reshape((h, w, c) if c > 1 else (h, w))
+
+    def acquire_latest(self, after_seq=0, claim=False):
+        """
+        Самый свежий кадр новее after_seq: (slot, seq, время захвата в нс, ndarray без копии)
+        или None. Слот занят до release(slot), писатель его не перезапишет.
+        claim=True - для процессов детекции: кадр достается только одному из них.
+        """
+        with self.lock:
+            slot = int(self.control[LATEST])
+            if slot < 0: return None
+            if claim: after_seq = max(after_seq, int(self.control[CLAIMED]))
+            if self.headers[slot, STATE] not in (READY, READING) or self.headers[slot, SEQ] <= after_seq:
+                return None
+            if claim: self.control[CLAIMED] = self.headers[slot, SEQ]
+            self.headers[slot, STATE] = READING
+            self.headers[slot, READERS] += 1
+            seq, stamp = int(self.headers[slot, SEQ]), int(self.headers[slot, STAMP])
+        return slot, seq, stamp, self._view(slot)
+
+    def release(self, slot):
+        with self.lock:
+            self.headers[slot, READERS] -= 1
+            if self.headers[slot, READERS] <= 0:
+                self.headers[slot, READERS] = 0
+                self.headers[slot, STATE] = READY
+
+    def read_latest_copy(self, after_seq=0):
+        """Копия самого свежего кадра (для превью): (seq, время захвата в нс, ndarray) или None"""
+        item = self.acquire_latest(after_seq)
+        if item is None: return None
+        slot, seq, stamp, view = item
+        try:
+            return seq, stamp, view.copy()
+        finally:
+            self.release(slot)
+
+    def close(self):
+        # Представления держат буфер - освобождаем их до закрытия сегмента
+        self.control = self.headers = self.data = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,86 @@
+# core/tiling.py
+"""
+Тайловая детекция для очень больших кадров (4K/8K, весь рабочий стол):
+кадр режется на перекрывающиеся тайлы одного размера, боксы из тайлов
+переводятся в координаты кадра и объединяются на швах.
+"""
+import numpy as np
+
+
+def tile_grid(height, width, tile_size, overlap):
+    """
+    Координаты тайлов (x0, y0, x1, y1), покрывающих кадр с перекрытием overlap (доля тайла).
+    Все тайлы одного размера: последние в ряду прижимаются к краю кадра.
+    """
+    tw, th = min(tile_size, width), min(tile_size, height)
+    step_x = max(1, int(tw * (1 - overlap)))
+    step_y = max(1, int(th * (1 - overlap)))
+
+    xs = list(range(0, max(width - tw, 0) + 1, step_x))
+    ys = list(range(0, max(height - th, 0) + 1, step_y))
+    if xs[-1] + tw < width: xs.append(width - tw)
+    if ys[-1] + th < height: ys.append(height - th)
+
+    return [(x, y, x + tw, y + th) for y in ys for x in xs]
+
+
+def _touches_seam(box, tile, width, height, margin=2):
+    """Бокс касается внутренней границы тайла - скорее всего обрезан швом"""
+    x0, y0, x1, y1 = tile
+    return ((x0 > 0 and box[0] - x0 <= margin) or (y0 > 0 and box[1] - y0 <= margin) or
+            (x1 < width and x1 - box[2] <= margin) or (y1 < height and y1 - box[3] <= margin))
+
+
+def merge_tile_boxes(tile_results, width, height, ios_thres=0.6):
+    """
+    Объединение боксов из тайлов.
+    tile_results: список (tile, boxes_list, conf_list), боксы в координатах кадра.
+    Один finder pattern из двух тайлов оставляется один раз: приоритет у боксов,
+    не обрезанных швом, затем по уверенности; дубликаты отсекаются по
+    пересечению, отнесенному к площади меньшего бокса (IoS).
+    """
+    boxes, confs, cut = [], [], []
+    for tile, tile_boxes, tile_confs in tile_results:
+        for box, conf in zip(tile_boxes, tile_confs):
+            boxes.append(box)
+            confs.append(conf)
+            cut.append(_touches_seam(box, tile, width, height))
+    if not boxes: return [], []
+
+    arr = np.array(boxes, dtype=np.float64).reshape(-1, 4)
+    conf = np.array(confs, dtype=np.float64)
+    order = np.lexsort((-conf, np.array(cut)))
+    areas = np.maximum((arr[:, 2] - arr[:, 0]) * (arr[:, 3] - arr[:, 1]), 1e-9)
+
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        iw = np.clip(np.minimum(arr[i, 2], arr[rest, 2]) - np.maximum(arr[i, 0], arr[rest, 0]), 0, None)
+        ih = np.clip(np.minimum(arr[i, 3], arr[rest, 3]) - np.maximum(arr[i, 1], arr[rest, 1]), 0, None)
+        ios = iw * ih / np.minimum(areas[i], areas[rest])
+        order = rest[ios <= ios_thres]
+
+    # Порядок как у YOLO: по убыванию уверенности
+    keep.sort(key=lambda k: -conf[k])
+    return [boxes[k] for k in keep], [confs[k] for k in keep]
+
+
+def predict_tiled(backend, image, tile_size, overlap, batch_size=8):
+    """
+    Детекция по тайлам через backend.predict: тайлы - это срезы кадра (без копий),
+    в сеть уходят пачками по batch_size, поэтому пиковая память не зависит от размера кадра.
+    """
+    height, width = image.shape[:2]
+    tiles = tile_grid(height, width, tile_size, overlap)
+
+    tile_results = []
+    for s in range(0, len(tiles), batch_size):
+        chunk = tiles[s:s + batch_size]
+        predictions = backend.predict([image[y0:y1, x0:x1] for x0, y0, x1, y1 in chunk])
+        for tile, (tile_boxes, tile_confs) in zip(chunk, predictions):
+            offset = np.array([tile[0], tile[1], tile[0], tile[1]])
+            tile_results.append((tile, [b + offset for b in tile_boxes], tile_confs))
+
+    return merge_tile_boxes(tile_results, width, height)
@@ -0,0 +1,107 @@
+# core/timing.py
+"""
+Замеры времени по стадиям конвейера (монотонные часы time.perf_counter).
+
+Каждая стадия пишется в два места:
+  - в разбивку текущего вызова (StageTimes, привязывается к потоку через collect),
+    она попадает в DetectionBatch.timings;
+  - в общие для процесса скользящие окна STAGE_STATS (p50/p95/p99 по стадии).
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+# Сколько последних замеров хранить на стадию
+HISTORY_SIZE = 2048
+
+
+class StageTimes:
+    """Разбивка одного вызова: стадия -> суммарное время, сек (повторы стадии складываются)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self._stages[stage] = self._stages.get(stage, 0.0) + seconds
+
+    def as_dict(self):
+        with self._lock:
+            return dict(self._stages)
+
+
+class StageHistograms:
+    """Потокобезопасные скользящие окна замеров по стадиям"""
+
+    def __init__(self, size=HISTORY_SIZE):
+        self._lock = threading.Lock()
+        self._size = size
+        self._samples = {}
+
+    def record(self, stage, seconds):
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self._size)
+            samples.append(seconds)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+    def percentiles(self):
+        """{стадия: count, p50_ms, p95_ms, p99_ms, mean_ms} по текущему окну"""
+        with self._lock:
+            snapshot = {stage: np.array(s, dtype=np.float64) for stage, s in self._samples.items() if s}
+
+        report = {}
+        for stage in sorted(snapshot):
+            ms = snapshot[stage] * 1000
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+            report[stage] = {
+                "count": int(ms.size),
+                "p50_ms": round(float(p50), 3),
+                "p95_ms": round(float(p95), 3),
+                "p99_ms": round(float(p99), 3),
+                "mean_ms": round(float(ms.mean()), 3)
+            }
+        return report
+
+
+STAGE_STATS = StageHistograms()
+_local = threading.local()
+
+
+@contextmanager
+def collect(times):
+    """Привязывает разбивку вызова к текущему потоку (вложенные вызовы восстанавливают прежнюю)"""
+    previous = getattr(_local, "times", None)
+    _local.times = times
+    try:
+        yield times
+    finally:
+        _local.times = previous
+
+
+def record(stage, seconds):
+    STAGE_STATS.record(stage, seconds)
+    times = getattr(_local, "times", None)
+    if times is not None:
+        times.add(stage, seconds)
+
+
+@contextmanager
+def stage(name):
+    t_start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - t_start)
+
+
+def stage_percentiles():
+    return STAGE_STATS.percentiles()
@@ -1,14 +1,21 @@
 # main.py
 import sys
-from PyQt6.QtWidgets import QApplication
-from PyQt6.QtGui import QFont
-from ui.main_window import EliteMainWindow
+import time
+
+# Отсчет времени запуска - до импорта интерфейса
+STARTED_AT = time.perf_counter()
 
 if __name__ == "__main__":
+    # Импорт интерфейса только здесь: процессы multiprocessing ("spawn") заново
+    # выполняют этот модуль как __mp_main__ и не должны тянуть PyQt6 и ui
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtGui import QFont
+    from ui.main_window import EliteMainWindow
+
     app = QApplication(sys.argv)
     app.setFont(QFont("Segoe UI", 10))
 
-    window = EliteMainWindow()
+    window = EliteMainWindow(started_at=STARTED_AT)
     window.show()
 
-    sys.exit(app.exec())
\ No newline at end of file
+    sys.exit(app.exec())
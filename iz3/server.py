@@ -0,0 +1,152 @@
+# server.py
+"""
+Локальный HTTP-сервер детекции без интерфейса.
+
+    POST /detect  - изображение сырыми байтами (image/*, application/octet-stream)
+                    или multipart/form-data (поле "image" или первый файл) -> JSON DetectionBatch
+    GET  /stats   - глубина очереди, размеры пачек, перцентили задержек, стадии конвейера
+    GET  /health  - готовность
+
+Запросы, пришедшие в пределах --window мс, объединяются в один пакетный вызов YOLO.
+Запуск (из папки iz3):  python server.py --port 8765
+Проверка:  curl --data-binary @qr.png -H "Content-Type: image/png" http://127.0.0.1:8765/detect
+"""
+import sys
+import json
+import time
+import argparse
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+import config
+from core.factory import create_detector
+from core.micro_batcher import MicroBatcher, QueueFull
+from core.timing import stage_percentiles
+
+# Максимальный размер тела запроса
+MAX_BODY = 64 * 2 ** 20
+
+
+def multipart_image(content_type, body):
+    """Байты изображения из multipart/form-data: поле "image", иначе первый файл"""
+    message = BytesParser(policy=HTTP).parsebytes(
+        b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + body)
+    if not message.is_multipart(): return None
+
+    parts = list(message.iter_parts())
+    for part in parts:
+        if part.get_param("name", header="content-disposition") == "image":
+            return part.get_payload(decode=True)
+    files = [part for part in parts if part.get_filename()]
+    return files[0].get_payload(decode=True) if files else None
+
+
+class DetectionHandler(BaseHTTPRequestHandler):
+    server_version = "iz3-detect/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/stats":
+            self._send_json(200, {**self.server.batcher.stats(), "stages": stage_percentiles()})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/detect":
+            # Тело не читаем - закрываем соединение, иначе оно разберется как следующий запрос
+            self.close_connection = True
+            self._send_json(404, {"error": "not found"})
+            return
+
+        t_start = time.perf_counter()
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length <= 0 or length > MAX_BODY:
+            # Тело не прочитано - иначе его байты разобрались бы как следующий запрос
+            self.close_connection = True
+            self._send_json(413 if length > MAX_BODY else 400, {"error": "missing, empty or too large body"})
+            return
+        body = self.rfile.read(length)
+
+        content_type = self.headers.get("Content-Type", "")
+        if content_type.startswith("multipart/form-data"):
+            body = multipart_image(content_type, body)
+        img = cv2.imdecode(np.frombuffer(body, dtype=np.uint8), cv2.IMREAD_COLOR) if body else None
+        if img is None:
+            self._send_json(400, {"error": "image could not be decoded"})
+            return
+
+        batcher = self.server.batcher
+        try:
+            result = batcher.submit(img).result(timeout=self.server.request_timeout)
+        except QueueFull as e:
+            self._send_json(503, {"error": str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+            return
+
+        request_time = time.perf_counter() - t_start
+        batcher.metrics.record("request", request_time)
+        self._send_json(200, {**result.to_dict(), "request_ms": round(request_time * 1000, 3)})
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(detector, host="127.0.0.1", port=8765, batch_size=8, window=0.005, max_queue=64,
+                request_timeout=30.0, verbose=False):
+    """HTTP-сервер с микро-пакетированием поверх готового детектора (port=0 - свободный порт)"""
+    server = ThreadingHTTPServer((host, port), DetectionHandler)
+    server.daemon_threads = True
+    server.batcher = MicroBatcher(detector, batch_size=batch_size, window=window, max_queue=max_queue)
+    server.request_timeout = request_timeout
+    server.verbose = verbose
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--batch-size", type=int, default=config.DETECT_BATCH_SIZE)
+    parser.add_argument("--window", type=float, default=5.0, help="окно сбора пачки, мс")
+    parser.add_argument("--max-queue", type=int, default=64)
+    parser.add_argument("--replicas", type=int, default=config.DETECTOR_REPLICAS)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    detector = create_detector(replicas=args.replicas)
+    server = make_server(detector, args.host, args.port, args.batch_size, args.window / 1000,
+                         args.max_queue, verbose=args.verbose)
+    print(f"[SYSTEM] Detection server on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.batcher.close()
+        detector.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
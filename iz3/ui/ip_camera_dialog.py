@@ -6,7 +6,8 @@ from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout,
 from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QSettings, QRect
 from PyQt6.QtGui import QImage, QPixmap, QColor, QPainter, QPen, QLinearGradient
 
-from core.ip_worker import IPCameraWorker
+from config import LIVE_DECODE_BUDGET, MULTIPROCESS_DETECTION, DETECTOR_PROCESSES, MULTIPROCESS_FRAME_BYTES
+from core.ip_worker import IPCameraWorker, MultiprocCameraWorker
 from ui.loading import LoadingOverlay
 
 
@@ -149,7 +150,12 @@ class IPCameraDialog(QDialog):
             "background-color: #c42b1c; color: white; padding: 8px 15px; font-weight: bold; border-radius: 4px;")
         self.video_label.setText("ПОДКЛЮЧЕНИЕ...")
 
-        self.worker = IPCameraWorker(url, self.detector)
+        if MULTIPROCESS_DETECTION:
+            self.worker = MultiprocCameraWorker(url, self.detector, detectors=DETECTOR_PROCESSES,
+                                                frame_bytes=MULTIPROCESS_FRAME_BYTES,
+                                                budget=LIVE_DECODE_BUDGET)
+        else:
+            self.worker = IPCameraWorker(url, self.detector, budget=LIVE_DECODE_BUDGET)
         self.worker.frame_ready.connect(self.update_frame)
         self.worker.result_ready.connect(self.handle_result)
         self.worker.error_occurred.connect(self.handle_error)
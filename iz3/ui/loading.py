@@ -5,15 +5,16 @@ from PyQt6.QtGui import QColor, QPainter, QBrush, QPen
 
 
 class LoadingOverlay(QWidget):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, text="ОБРАБОТКА"):
         super().__init__(parent)
+        self.text = text
         self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)  # Пропускать клики сквозь
         self.hide()
 
         layout = QVBoxLayout(self)
         layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
-        self.label = QLabel("ОБРАБОТКА...")
+        self.label = QLabel(f"{self.text}...")
         self.label.setStyleSheet("""
             QLabel {
                 color: white;
@@ -32,7 +33,10 @@ class LoadingOverlay(QWidget):
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.animate_text)
 
-    def start(self):
+    def start(self, text=None):
+        if text:
+            self.text = text
+            self.label.setText(f"{self.text}...")
         self.resize(self.parent().size())
         self.show()
         self.timer.start(300)
@@ -43,7 +47,7 @@ class LoadingOverlay(QWidget):
 
     def animate_text(self):
         self.dots = (self.dots + 1) % 4
-        self.label.setText(f"ОБРАБОТКА{'.' * self.dots}")
+        self.label.setText(f"{self.text}{'.' * self.dots}")
 
     def paintEvent(self, event):
 
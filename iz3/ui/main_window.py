@@ -12,18 +12,23 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QImage, QPixmap, QDragEnterEvent, QDropEvent, QDragMoveEvent
 
-from config import MODEL_PATH
+from config import DETECT_BATCH_SIZE
+from core.factory import create_detector
 from core.stats_manager import StatsManager
-from core.detector import QRDetector
+from core.model_loader import ModelLoaderWorker
 from core.snipper import SnippingWidget
 from ui.widgets import IndButton, PhotoViewer, GroupResultWidget
 from ui.stats_window import StatsWindow
 from ui.ip_camera_dialog import IPCameraDialog
+from ui.loading import LoadingOverlay
 
 
 class EliteMainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, started_at=None):
         super().__init__()
+        # Отсчет времени запуска: до первой отрисовки окна и до готовности модели
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.first_paint_at = None
         self.setWindowTitle("QR ANALYZER")
         self.resize(1300, 850)
         self.setStyleSheet("QMainWindow { background-color: #1e1e1e; }")
@@ -38,10 +43,10 @@ class EliteMainWindow(QMainWindow):
         self.batch_items = []
         self.batch_index = 0
 
-        try:
-            self.detector = QRDetector(MODEL_PATH)
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка загрузки модели", f"Не удалось загрузить модель:\n{e}")
+        # Модель грузится в фоне после первой отрисовки окна (см. paintEvent)
+        self.model_loader = ModelLoaderWorker(create_detector)
+        self.model_loader.loaded.connect(self.on_model_loaded)
+        self.model_loader.failed.connect(self.on_model_failed)
 
         self.snipper = SnippingWidget()
         self.snipper.on_snip_taken.connect(self.process_snip_image)
@@ -72,6 +77,9 @@ class EliteMainWindow(QMainWindow):
 
 
         path = urls[0].toLocalFile()
+        if not self.detector:
+            self.status_bar.setText("Модель еще загружается...")
+            return
 
 
         if os.path.isdir(path):
@@ -210,12 +218,43 @@ class EliteMainWindow(QMainWindow):
         main_layout.addWidget(sidebar)
         main_layout.addWidget(preview_panel)
 
-        if not self.detector:
-            self.status_bar.setText("ОШИБКА: МОДЕЛЬ НЕ ЗАГРУЖЕНА")
-            self.status_bar.setStyleSheet("background-color: #c42b1c; color: white; font-weight: bold;")
-            self.btn_file.setEnabled(False)
-            self.btn_monitor.setEnabled(False)
-            self.btn_ip_cam.setEnabled(False)
+        # До загрузки модели кнопки обработки недоступны
+        self.loading_overlay = LoadingOverlay(preview_panel, "ЗАГРУЗКА МОДЕЛИ")
+        self.status_bar.setText("Загрузка модели...")
+        self.status_bar.setStyleSheet("background-color: #e6a700; color: black; font-weight: bold;")
+        self._set_controls_enabled(False)
+
+    def _set_controls_enabled(self, enabled):
+        self.btn_file.setEnabled(enabled)
+        self.btn_monitor.setEnabled(enabled)
+        self.btn_ip_cam.setEnabled(enabled)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.first_paint_at is None:
+            self.first_paint_at = time.perf_counter()
+            print(f"[SYSTEM] Time to first paint: {self.first_paint_at - self.started_at:.3f}s")
+            # Загрузку запускаем после того, как окно уже показано и уложено
+            self.loading_overlay.start()
+            QTimer.singleShot(0, self.model_loader.start)
+
+    def on_model_loaded(self, detector, load_time):
+        self.detector = detector
+        ready = time.perf_counter() - self.started_at
+        print(f"[SYSTEM] Time to ready: {ready:.3f}s (model load {load_time:.3f}s)")
+
+        self.loading_overlay.stop()
+        self._set_controls_enabled(True)
+        self.status_bar.setText(f"Система готова ({ready:.1f} с). Перетащите папку или файл.")
+        self.status_bar.setStyleSheet(
+            "background-color: #007acc; color: white; font-weight: bold; font-family: 'Segoe UI'; font-size: 12px;"
+        )
+
+    def on_model_failed(self, error):
+        self.loading_overlay.stop()
+        self.status_bar.setText("ОШИБКА: МОДЕЛЬ НЕ ЗАГРУЖЕНА")
+        self.status_bar.setStyleSheet("background-color: #c42b1c; color: white; font-weight: bold;")
+        QMessageBox.critical(self, "Ошибка загрузки модели", f"Не удалось загрузить модель:\n{error}")
 
 
     def clear_view(self):
@@ -303,44 +342,66 @@ class EliteMainWindow(QMainWindow):
         total = len(images)
         processed = 0
         found_total = 0
+        skipped = []
 
         self.status_bar.setText(f"Обработка: 0 / {total}")
         self.status_bar.setStyleSheet("background-color: #e6a700; color: black;")
 
-        for img_file in images:
-            full_path = os.path.join(folder_path, img_file)
-            processed += 1
+        for start in range(0, total, DETECT_BATCH_SIZE):
+            chunk_files = images[start:start + DETECT_BATCH_SIZE]
+            processed += len(chunk_files)
+
+            loaded = []
+            for img_file in chunk_files:
+                full_path = os.path.join(folder_path, img_file)
+                try:
+                    img = cv2.imdecode(np.fromfile(full_path, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+                except Exception as e:
+                    img = None
+                    print(f"[WARNING] Cannot read {full_path}: {e}")
+                if img is None:
+                    skipped.append(img_file)
+                    continue
+                if img.ndim == 2: img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+                elif img.shape[2] == 4: img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+                loaded.append((img_file, full_path, img))
 
             try:
-                stream = open(full_path, "rb")
-                bytes_data = bytearray(stream.read())
-                numpyarray = np.asarray(bytes_data, dtype=np.uint8)
-                img = cv2.imdecode(numpyarray, cv2.IMREAD_UNCHANGED)
-
-                if img is not None:
-                    if img.shape[2] == 4: img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
-
-                    qr_data, _, duration = self.detector.detect_and_decode(img)
-
-                    self.batch_items.append({
-                        'path': full_path,
-                        'image': None,
-                        'data': qr_data
-                    })
-
-                    if qr_data:
-                        found_total += len(qr_data)
-                        self.stats_manager.add_record(img_file, qr_data, duration)
-                        self.add_group_result(img_file, qr_data)
-
-            except Exception:
-                pass
-
-            if processed % 5 == 0:
-                self.status_bar.setText(f"Обработка: {processed} / {total}")
-                QApplication.processEvents()
+                outputs = self.detector.detect_batch([img for _, _, img in loaded], DETECT_BATCH_SIZE)
+            except Exception as e:
+                # Одно плохое изображение роняет всю пачку - повторяем пачку по одному
+                print(f"[WARNING] Batch detection failed ({e}), retrying {len(loaded)} images one by one")
+                outputs = []
+                for img_file, full_path, img in loaded:
+                    try:
+                        outputs.append(self.detector.detect(img))
+                    except Exception as e:
+                        print(f"[WARNING] Detection failed for {full_path}: {e}")
+                        skipped.append(img_file)
+                        outputs.append(None)
+
+            for (img_file, full_path, _), qr_data in zip(loaded, outputs):
+                if qr_data is None: continue
+                duration = qr_data.duration
+                self.batch_items.append({
+                    'path': full_path,
+                    'image': None,
+                    'data': qr_data
+                })
 
-        self.status_bar.setText(f"Готово. Обработано {total}, Найдено {found_total}")
+                if qr_data:
+                    found_total += len(qr_data)
+                    self.stats_manager.add_record(img_file, qr_data, duration)
+                    self.add_group_result(img_file, qr_data)
+
+            self.status_bar.setText(f"Обработка: {processed} / {total}")
+            QApplication.processEvents()
+
+        status = f"Готово. Обработано {total}, Найдено {found_total}"
+        if skipped:
+            status += f", Пропущено {len(skipped)}"
+            print(f"[WARNING] Skipped files: {', '.join(skipped)}")
+        self.status_bar.setText(status)
         self.status_bar.setStyleSheet("background-color: #2da44e; color: white; font-weight: bold;")
 
         if self.batch_items:
@@ -359,7 +420,8 @@ class EliteMainWindow(QMainWindow):
             if img is not None:
                 if img.shape[2] == 4: img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
 
-                qr_data, _, duration = self.detector.detect_and_decode(img)
+                qr_data = self.detector.detect(img)
+                duration = qr_data.duration
 
                 self.batch_items = [{
                     'path': path,
@@ -461,4 +523,11 @@ class EliteMainWindow(QMainWindow):
 
         self._display_image(drawn_img)
         self.stats_manager.add_record(name, qr_data, duration)
-        self.add_group_result(name, qr_data)
\ No newline at end of file
+        self.add_group_result(name, qr_data)
+
+    def closeEvent(self, event):
+        # Поток загрузки нельзя уничтожать на ходу - дожидаемся его
+        if self.model_loader.isRunning(): self.model_loader.wait()
+        # Сохраняем статистику стратегий декодирования и останавливаем пул потоков
+        if self.detector: self.detector.close()
+        super().closeEvent(event)
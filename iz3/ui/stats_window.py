@@ -5,12 +5,14 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtGui import QFont
 
+from core.timing import stage_percentiles
+
 class StatsWindow(QDialog):
     def __init__(self, stats_manager, parent=None):
         super().__init__(parent)
         self.manager = stats_manager
         self.setWindowTitle("Метрики и Статистика")
-        self.resize(900, 500)
+        self.resize(900, 700)
         self.setStyleSheet("background-color: #1e1e1e; color: #d4d4d4;")
 
         layout = QVBoxLayout(self)
@@ -20,31 +22,24 @@ class StatsWindow(QDialog):
         lbl.setStyleSheet("color: #007acc; letter-spacing: 1px;")
         layout.addWidget(lbl)
 
-        self.table = QTableWidget()
+        self.table = self._make_table()
         cols = ["Время", "Источник", "Кол-во QR", "YOLO Conf (Avg)", "Geo Score (Avg)", "Время обр. (сек)"]
         self.table.setColumnCount(len(cols))
         self.table.setHorizontalHeaderLabels(cols)
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
-        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
-        self.table.setStyleSheet("""
-            QTableWidget {
-                background-color: #252526;
-                gridline-color: #3e3e42;
-                border: 1px solid #3e3e42;
-                font-family: 'Segoe UI';
-            }
-            QHeaderView::section {
-                background-color: #333337;
-                padding: 5px;
-                border: 1px solid #3e3e42;
-                font-weight: bold;
-            }
-            QTableWidget::item { padding: 5px; }
-            QTableWidget::item:selected { background-color: #007acc; }
-        """)
         layout.addWidget(self.table)
 
+        # Задержки по стадиям конвейера (скользящее окно на весь процесс)
+        lbl_stages = QLabel("ЗАДЕРЖКИ ПО СТАДИЯМ (мс)")
+        lbl_stages.setFont(QFont("Segoe UI", 11, QFont.Weight.Bold))
+        lbl_stages.setStyleSheet("color: #007acc; letter-spacing: 1px;")
+        layout.addWidget(lbl_stages)
+
+        self.stage_table = self._make_table()
+        stage_cols = ["Стадия", "Замеров", "p50", "p95", "p99", "Среднее"]
+        self.stage_table.setColumnCount(len(stage_cols))
+        self.stage_table.setHorizontalHeaderLabels(stage_cols)
+        layout.addWidget(self.stage_table)
+
         btn_layout = QHBoxLayout()
         btn_export = QPushButton("Экспорт в CSV")
         btn_export.setFixedHeight(35)
@@ -69,6 +64,30 @@ class StatsWindow(QDialog):
 
         self.load_data()
 
+    @staticmethod
+    def _make_table():
+        table = QTableWidget()
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        table.setStyleSheet("""
+            QTableWidget {
+                background-color: #252526;
+                gridline-color: #3e3e42;
+                border: 1px solid #3e3e42;
+                font-family: 'Segoe UI';
+            }
+            QHeaderView::section {
+                background-color: #333337;
+                padding: 5px;
+                border: 1px solid #3e3e42;
+                font-weight: bold;
+            }
+            QTableWidget::item { padding: 5px; }
+            QTableWidget::item:selected { background-color: #007acc; }
+        """)
+        return table
+
     def load_data(self):
         history = self.manager.get_history()
         self.table.setRowCount(len(history))
@@ -80,6 +99,16 @@ class StatsWindow(QDialog):
             self.table.setItem(i, 4, QTableWidgetItem(str(row['geo_score_avg'])))
             self.table.setItem(i, 5, QTableWidgetItem(str(row['duration'])))
 
+        stages = stage_percentiles()
+        self.stage_table.setRowCount(len(stages))
+        for i, (name, row) in enumerate(stages.items()):
+            self.stage_table.setItem(i, 0, QTableWidgetItem(name))
+            self.stage_table.setItem(i, 1, QTableWidgetItem(str(row['count'])))
+            self.stage_table.setItem(i, 2, QTableWidgetItem(str(row['p50_ms'])))
+            self.stage_table.setItem(i, 3, QTableWidgetItem(str(row['p95_ms'])))
+            self.stage_table.setItem(i, 4, QTableWidgetItem(str(row['p99_ms'])))
+            self.stage_table.setItem(i, 5, QTableWidgetItem(str(row['mean_ms'])))
+
     def export_data(self):
         path, _ = QFileDialog.getSaveFileName(self, "Сохранить CSV", "", "CSV Files (*.csv)")
         if path: